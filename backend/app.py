@@ -2,6 +2,11 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from database_models import db
+from commands import register_commands
+from utils import UploadLimitRequest
+import dashboard_stats
+from search_index import ensure_index
+import floorplan_store
 
 # Blueprint 임포트
 from routes.users import users_bp
@@ -17,6 +22,7 @@ from routes.floorplan import floorplan_bp
 def create_app(config_class=Config):
     """애플리케이션 팩토리"""
     app = Flask(__name__)
+    app.request_class = UploadLimitRequest
     
     # 설정 적용
     app.config.from_object(config_class)
@@ -35,9 +41,20 @@ def create_app(config_class=Config):
     app.register_blueprint(imports_bp)
     app.register_blueprint(floorplan_bp)
     
+    # CLI 명령 등록
+    register_commands(app)
+    
     # 데이터베이스 테이블 생성
     with app.app_context():
         db.create_all()
+        # SQL로 직접 넣은 기존 데이터도 검색되도록 미완료 필드 색인
+        ensure_index()
+        db.session.commit()
+        # 기존 JSON 배치도가 아직 DB로 옮겨지지 않았으면 옮김
+        floorplan_store.ensure_migrated()
+    
+    # 대시보드 통계 주기적 재집계
+    dashboard_stats.init_app(app)
     
     return app
 
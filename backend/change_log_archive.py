@@ -0,0 +1,162 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from flask import current_app
+from database_models import db, ChangeLog
+
+ARCHIVE_FILE_PREFIX = 'change_log_'
+ARCHIVE_FILE_SUFFIX = '.jsonl.gz'
+DELETE_CHUNK_SIZE = 1000
+
+
+def archive_dir():
+    """보관 파일 디렉터리 (CHANGE_LOG_ARCHIVE_DIR, 상대 경로는 backend 기준)"""
+    path = current_app.config.get('CHANGE_LOG_ARCHIVE_DIR', os.path.join('data', 'change_log_archive'))
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return path
+
+
+def archive_path(month):
+    return os.path.join(archive_dir(), f'{ARCHIVE_FILE_PREFIX}{month}{ARCHIVE_FILE_SUFFIX}')
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    month = value.year * 12 + value.month - 1 + months
+    return datetime(month // 12, month % 12 + 1, 1)
+
+
+def archived_months():
+    """보관된 월 목록 ('YYYY-MM', 오래된 순)"""
+    path = archive_dir()
+    if not os.path.isdir(path):
+        return []
+    months = [
+        name[len(ARCHIVE_FILE_PREFIX):-len(ARCHIVE_FILE_SUFFIX)]
+        for name in os.listdir(path)
+        if name.startswith(ARCHIVE_FILE_PREFIX) and name.endswith(ARCHIVE_FILE_SUFFIX)
+    ]
+    return sorted(months)
+
+
+def _read_month(month):
+    with gzip.open(archive_path(month), 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_month(month, rows):
+    """월 파일을 임시 파일에 쓴 뒤 교체 (기존 보관분과 합침)"""
+    os.makedirs(archive_dir(), exist_ok=True)
+    path = archive_path(month)
+    temp_path = path + '.tmp'
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+        if os.path.exists(path):
+            for row in _read_month(month):
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+    os.replace(temp_path, path)
+
+
+def archive_change_logs(keep_months):
+    """최근 keep_months개월(이번 달 포함)보다 오래된 이력을 월별 압축 파일로 옮김
+    
+    월 단위로 파일을 쓴 뒤 해당 행을 삭제하고 커밋한다. 중간에 실패해도 이미 옮긴 월은 유지되며,
+    파일 쓰기 후 삭제 전에 실패한 월은 다시 실행하면 중복 없이 이어서 처리되도록 id 기준으로 거른다.
+    반환값은 {월: 옮긴 행 수}.
+    """
+    cutoff = add_months(month_start(datetime.utcnow()), -(keep_months - 1))
+    oldest = db.session.query(db.func.min(ChangeLog.change_date)).filter(
+        ChangeLog.change_date < cutoff
+    ).scalar()
+    
+    counts = {}
+    if oldest is None:
+        return counts
+    
+    start = month_start(oldest)
+    while start < cutoff:
+        end = add_months(start, 1)
+        month = start.strftime('%Y-%m')
+        query = ChangeLog.query.filter(
+            ChangeLog.change_date >= start,
+            ChangeLog.change_date < end
+        ).order_by(ChangeLog.change_date, ChangeLog.id)
+        if not db.session.query(query.exists()).scalar():
+            start = end
+            continue
+        
+        archived_ids = set()
+        if os.path.exists(archive_path(month)):
+            archived_ids = {row['id'] for row in _read_month(month)}
+        ids = []
+        
+        def rows():
+            for log in query.yield_per(DELETE_CHUNK_SIZE):
+                ids.append(log.id)
+                if log.id not in archived_ids:
+                    yield log.to_dict()
+        
+        _write_month(month, rows())
+        
+        table = ChangeLog.__table__
+        for i in range(0, len(ids), DELETE_CHUNK_SIZE):
+            db.session.execute(table.delete().where(table.c.id.in_(ids[i:i + DELETE_CHUNK_SIZE])))
+        counts[month] = len(ids)
+        db.session.commit()
+        db.session.expunge_all()
+        start = end
+    
+    return counts
+
+
+def iter_archive(entity_type=None, entity_id=None, change_type=None, changed_by=None,
+                 start_date=None, end_date=None, before=None):
+    """보관 파일에서 조건에 맞는 이력을 최신순으로 생성 (날짜 범위 밖의 월 파일은 열지 않음)
+    
+    before=(change_date, id)이면 그 키보다 앞선(오래된) 행만 반환한다 (키셋 페이지네이션용).
+    """
+    for month in reversed(archived_months()):
+        month_begin = datetime.strptime(month, '%Y-%m')
+        if start_date and add_months(month_begin, 1) <= start_date:
+            break
+        if end_date and month_begin > end_date:
+            continue
+        if before and month_begin > before[0]:
+            continue
+        
+        rows = []
+        for row in _read_month(month):
+            if entity_type and row['entity_type'] != entity_type:
+                continue
+            if entity_id is not None and row['entity_id'] != entity_id:
+                continue
+            if change_type and row['change_type'] != change_type:
+                continue
+            if changed_by and changed_by.lower() not in (row['changed_by'] or '').lower():
+                continue
+            change_date = datetime.fromisoformat(row['change_date'])
+            if start_date and change_date < start_date:
+                continue
+            if end_date and change_date > end_date:
+                continue
+            if before and (change_date, row['id']) >= before:
+                continue
+            rows.append((change_date, row))
+        
+        rows.sort(key=lambda item: (item[0], item[1]['id']), reverse=True)
+        for _, row in rows:
+            yield row
+
+
+def query_archive(limit=None, **filters):
+    """iter_archive 결과를 최대 limit건 목록으로 반환"""
+    return list(islice(iter_archive(**filters), limit))
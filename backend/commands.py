@@ -0,0 +1,77 @@
+import click
+from database_models import db, Equipment
+from search_index import rebuild_index
+from dashboard_stats import reconcile_statistics
+from change_log_archive import archive_change_logs
+import floorplan_store
+from seal_inspection import recompute_inspection_due
+
+
+def register_commands(app):
+    """관리용 CLI 명령 등록 (flask --app app <명령>)"""
+    
+    @app.cli.command('repair-current-holders')
+    def repair_current_holders():
+        """할당 이력 기준으로 장비의 현재 사용자 컬럼 재구성"""
+        count = Equipment.rebuild_current_holders()
+        db.session.commit()
+        click.echo(f'장비 {count}대의 현재 사용자 정보를 재구성했습니다.')
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """부분 문자열 검색용 n-gram 색인 전체 재구성"""
+        counts = rebuild_index()
+        db.session.commit()
+        for field, count in counts.items():
+            click.echo(f'{field}: {count}개 값 색인')
+    
+    @app.cli.command('reconcile-statistics')
+    def reconcile_statistics_command():
+        """원본 테이블 기준으로 대시보드 통계 집계 테이블 재작성"""
+        reconcile_statistics()
+        db.session.commit()
+        click.echo('대시보드 통계를 재집계했습니다.')
+    
+    @app.cli.command('archive-change-logs')
+    @click.option('--keep-months', type=int, default=None,
+                  help='DB에 남길 개월 수 (기본값: CHANGE_LOG_HOT_MONTHS)')
+    def archive_change_logs_command(keep_months):
+        """오래된 변경 이력을 월별 압축 파일(jsonl.gz)로 옮기고 DB에서 삭제"""
+        keep_months = keep_months or app.config.get('CHANGE_LOG_HOT_MONTHS', 12)
+        counts = archive_change_logs(keep_months)
+        for month, count in counts.items():
+            click.echo(f'{month}: {count}건 보관')
+        if not counts:
+            click.echo('보관할 변경 이력이 없습니다.')
+    
+    @app.cli.command('recompute-seal-inspections')
+    def recompute_seal_inspections():
+        """점검 주기(SEAL_INSPECTION_INTERVAL_DAYS) 기준으로 보안씰 다음 점검 예정일 재계산"""
+        count = recompute_inspection_due()
+        db.session.commit()
+        click.echo(f'보안씰 {count}개의 다음 점검 예정일을 갱신했습니다.')
+    
+    @app.cli.command('migrate-floorplan')
+    @click.option('--source', default=None,
+                  help='층별 JSON 디렉터리 또는 floorplan_floors.json 경로 (기본값: backend/data)')
+    @click.option('--force', is_flag=True, help='DB에 이미 층이 있어도 JSON 내용으로 덮어씀')
+    def migrate_floorplan(source, force):
+        """기존 JSON 파일의 배치도를 DB 테이블(floorplan_floor/seat/facility)로 옮김"""
+        if floorplan_store.floor_ids() and not force:
+            click.echo('DB에 이미 배치도 층이 있습니다. 덮어쓰려면 --force를 지정하세요.')
+            return
+        
+        floors = floorplan_store.read_json_floors(source)
+        if floors:
+            versions = floorplan_store.save_all_floors(floors)
+            for floor_id, data in floors.items():
+                version = versions[str(floorplan_store.floor_number(floor_id))]
+                click.echo(f'{floor_id}층: 항목 {len(data.get("items", []))}개 (버전 {version})')
+            return
+        
+        # JSON 원본이 없으면 테이블에만 있던 기존 좌석/시설 행을 층 데이터로 편입
+        adopted = floorplan_store.adopt_legacy_rows()
+        for floor in adopted:
+            click.echo(f'{floor}층: 기존 좌석/시설 행 편입')
+        if not adopted:
+            click.echo('옮길 배치도 데이터가 없습니다.')
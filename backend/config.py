@@ -14,4 +14,19 @@ class Config:
         'pool_pre_ping': True,
         'pool_recycle': 3600,
     }
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    IMPORT_MAX_CONTENT_LENGTH = int(os.getenv('IMPORT_MAX_CONTENT_LENGTH', str(200 * 1024 * 1024)))  # 엑셀 임포트 업로드 제한(기본 200MB)
+    UPLOAD_LIMITS = {  # 엔드포인트별 업로드 제한, 없으면 MAX_CONTENT_LENGTH
+        'imports.preview_excel_import': IMPORT_MAX_CONTENT_LENGTH,
+        'imports.execute_excel_import': IMPORT_MAX_CONTENT_LENGTH,
+    }
+    COUNT_CACHE_TTL = int(os.getenv('COUNT_CACHE_TTL', '60'))  # 커서 페이지네이션 근사 건수 캐시(초)
+    COUNT_CACHE_SIZE = int(os.getenv('COUNT_CACHE_SIZE', '256'))  # 근사 건수 캐시 최대 항목 수
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '500'))  # 엑셀 임포트 일괄 처리 행 수
+    IMPORT_JOB_WORKERS = int(os.getenv('IMPORT_JOB_WORKERS', '2'))  # 백그라운드 임포트 작업 스레드 수
+    IMPORT_JOB_RETENTION = int(os.getenv('IMPORT_JOB_RETENTION', '3600'))  # 완료된 임포트 작업 상태 보관 시간(초)
+    STATISTICS_RECONCILE_INTERVAL = int(os.getenv('STATISTICS_RECONCILE_INTERVAL', '3600'))  # 대시보드 통계 재집계 주기(초), 0이면 비활성
+    SEAL_BULK_LIMIT = int(os.getenv('SEAL_BULK_LIMIT', '5000'))  # 보안씰 일괄 등록 1회 최대 개수
+    SEAL_INSPECTION_INTERVAL_DAYS = int(os.getenv('SEAL_INSPECTION_INTERVAL_DAYS', '180'))  # 보안씰 점검 주기(일), 다음 점검 예정일 계산 기준
+    CHANGE_LOG_HOT_MONTHS = int(os.getenv('CHANGE_LOG_HOT_MONTHS', '12'))  # DB에 유지할 변경 이력 개월 수(이번 달 포함)
+    CHANGE_LOG_ARCHIVE_DIR = os.getenv('CHANGE_LOG_ARCHIVE_DIR', os.path.join('data', 'change_log_archive'))  # 보관 파일 위치(상대 경로는 backend 기준)
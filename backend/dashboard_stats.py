@@ -0,0 +1,191 @@
+import threading
+import time
+from collections import Counter
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from database_models import db, Equipment, User, SecuritySeal, Assignment, StatisticsCounter
+
+# 집계 대상 (모델 -> (지표, 그룹 컬럼)), 그룹 컬럼이 None이면 전체 건수
+COUNTED_FIELDS = {
+    Equipment: (('total_equipment', None), ('by_status', 'status'), ('by_category', 'category')),
+    User: (('total_users', None), ('by_department', 'department'), ('by_location', 'location')),
+    SecuritySeal: (('total_seals', None), ('by_seal_status', 'status')),
+    Assignment: (('by_assignment_status', 'status'),),
+}
+
+RECONCILED_METRIC = '_reconciled_at'
+
+# ON CONFLICT DO UPDATE 방식 upsert를 쓰는 DB (MySQL은 ON DUPLICATE KEY UPDATE)
+UPSERT_DIALECTS = {'sqlite': sqlite, 'postgresql': postgresql}
+
+
+def _apply_deltas(connection, deltas):
+    """집계 테이블에 증감 반영 (호출한 트랜잭션 안에서 실행)
+    
+    행이 없으면 만들고 있으면 더하는 한 문장 upsert라 동시에 같은 키를 처음 쓰더라도 충돌하지 않는다.
+    키 순서로 반영해 여러 트랜잭션이 같은 행들을 잠글 때 교착을 피한다.
+    """
+    rows = [
+        {'metric': metric, 'group_key': group_key, 'value': delta}
+        for (metric, group_key), delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+    
+    table = StatisticsCounter.__table__
+    dialect = connection.dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update(value=table.c.value + statement.inserted.value)
+    elif dialect in UPSERT_DIALECTS:
+        statement = UPSERT_DIALECTS[dialect].insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.metric, table.c.group_key],
+            set_={'value': table.c.value + statement.excluded.value}
+        )
+    else:
+        raise NotImplementedError(f'통계 집계 upsert를 지원하지 않는 DB입니다: {dialect}')
+    connection.execute(statement, rows)
+
+
+def _row_deltas(model, values, sign):
+    deltas = Counter()
+    for metric, column in COUNTED_FIELDS[model]:
+        if column is None:
+            deltas[(metric, '')] += sign
+        elif values.get(column) is not None:
+            deltas[(metric, str(values[column]))] += sign
+    return deltas
+
+
+def count_rows(model, rows, sign=1, connection=None):
+    """ORM flush를 거치지 않는 대량 insert/delete 결과를 집계에 반영"""
+    deltas = Counter()
+    for row in rows:
+        deltas.update(_row_deltas(model, row, sign))
+    _apply_deltas(connection or db.session.connection(), deltas)
+
+
+def reconcile_statistics():
+    """원본 테이블을 다시 집계하여 집계 테이블 전체를 재작성"""
+    rows = {}
+    for model, fields in COUNTED_FIELDS.items():
+        for metric, column in fields:
+            if column is None:
+                rows[(metric, '')] = model.query.count()
+                continue
+            group_column = getattr(model, column)
+            grouped = db.session.query(group_column, db.func.count()).group_by(group_column).all()
+            for group_key, count in grouped:
+                if group_key is not None:
+                    rows[(metric, str(group_key))] = count
+    rows[(RECONCILED_METRIC, '')] = int(time.time())
+    
+    table = StatisticsCounter.__table__
+    db.session.execute(table.delete())
+    db.session.execute(table.insert(), [
+        {'metric': metric, 'group_key': group_key, 'value': value}
+        for (metric, group_key), value in rows.items()
+    ])
+
+
+def get_statistics_snapshot():
+    """집계 테이블에서 대시보드 통계 조회 (집계가 없으면 먼저 재집계)"""
+    counters = StatisticsCounter.query.all()
+    if not any(c.metric == RECONCILED_METRIC for c in counters):
+        reconcile_statistics()
+        db.session.commit()
+        counters = StatisticsCounter.query.all()
+    
+    grouped = {}
+    for counter in counters:
+        if counter.value > 0:
+            grouped.setdefault(counter.metric, {})[counter.group_key] = counter.value
+    
+    def total(metric):
+        return grouped.get(metric, {}).get('', 0)
+    
+    return {
+        'total_equipment': total('total_equipment'),
+        'total_users': total('total_users'),
+        'total_seals': total('total_seals'),
+        'active_assignments': grouped.get('by_assignment_status', {}).get('사용중', 0),
+        'by_status': grouped.get('by_status', {}),
+        'by_category': grouped.get('by_category', {}),
+        'by_department': grouped.get('by_department', {}),
+        'by_location': grouped.get('by_location', {}),
+        'by_seal_status': grouped.get('by_seal_status', {})
+    }
+
+
+def _pending_deltas(target):
+    session = db.inspect(target).session
+    return session.info.setdefault('statistics_deltas', Counter())
+
+
+def _on_insert(mapper, connection, target):
+    values = {column: getattr(target, column) for _, column in COUNTED_FIELDS[type(target)] if column}
+    _pending_deltas(target).update(_row_deltas(type(target), values, 1))
+
+
+def _on_delete(mapper, connection, target):
+    values = {column: getattr(target, column) for _, column in COUNTED_FIELDS[type(target)] if column}
+    _pending_deltas(target).update(_row_deltas(type(target), values, -1))
+
+
+def _on_update(mapper, connection, target):
+    state = db.inspect(target)
+    deltas = _pending_deltas(target)
+    for metric, column in COUNTED_FIELDS[type(target)]:
+        if column is None:
+            continue
+        history = state.attrs[column].history
+        if not history.has_changes():
+            continue
+        for old_value in history.deleted:
+            if old_value is not None:
+                deltas[(metric, str(old_value))] -= 1
+        for new_value in history.added:
+            if new_value is not None:
+                deltas[(metric, str(new_value))] += 1
+
+
+for _model in COUNTED_FIELDS:
+    event.listen(_model, 'after_insert', _on_insert)
+    event.listen(_model, 'before_delete', _on_delete)
+    event.listen(_model, 'before_update', _on_update)
+
+
+@event.listens_for(Session, 'before_flush')
+def _reset_deltas(session, flush_context, instances):
+    """이전에 실패한 flush에서 남은 증감값 제거"""
+    session.info.pop('statistics_deltas', None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_deltas(session, flush_context):
+    """flush 중 모인 증감값을 같은 트랜잭션에서 집계 테이블에 반영"""
+    deltas = session.info.pop('statistics_deltas', None)
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+
+
+def _reconcile_loop(app, interval):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                reconcile_statistics()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('통계 재집계 오류')
+
+
+def init_app(app):
+    """주기적 재집계 작업 시작 (STATISTICS_RECONCILE_INTERVAL 초, 0이면 비활성)"""
+    interval = app.config.get('STATISTICS_RECONCILE_INTERVAL', 0)
+    if interval > 0:
+        thread = threading.Thread(target=_reconcile_loop, args=(app, interval), daemon=True)
+        thread.start()
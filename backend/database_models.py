@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from collections import defaultdict
 from datetime import datetime
 
 db = SQLAlchemy()
@@ -40,22 +41,67 @@ class Equipment(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     asset_number = db.Column(db.String(50), unique=True, nullable=False, index=True)
     category = db.Column(db.String(50), nullable=False, index=True)
-    model_name = db.Column(db.String(100), nullable=False)
+    model_name = db.Column(db.String(100), nullable=False, index=True)
     acquisition_date = db.Column(db.Date, nullable=False)
     ip_address = db.Column(db.String(15), nullable=True)
     network_type = db.Column(db.String(20), nullable=True)
     windows_version = db.Column(db.String(20), nullable=True)
     status = db.Column(db.String(20), default='사용가능', nullable=False, index=True)  # 사용가능, 사용중, 수리중, 폐기
     notes = db.Column(db.Text, nullable=True)
+    # 현재 사용자 (사용중 할당의 비정규화 컬럼 - 할당/반납/임포트 시 갱신)
+    current_assignment_id = db.Column(
+        db.Integer,
+        db.ForeignKey('assignment.id', ondelete='SET NULL', use_alter=True, name='fk_equipment_current_assignment'),
+        nullable=True, index=True
+    )
+    current_user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # 관계
     security_seals = db.relationship('SecuritySeal', backref='equipment', lazy=True, cascade='all, delete-orphan')
-    assignments = db.relationship('Assignment', backref='equipment', lazy=True, cascade='all, delete-orphan')
+    assignments = db.relationship('Assignment', backref='equipment', lazy=True, cascade='all, delete-orphan',
+                                  foreign_keys='Assignment.equipment_id')
     maintenance_logs = db.relationship('MaintenanceLog', backref='equipment', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self, include_current_user=False):
+        current = None
+        if include_current_user and self.current_assignment_id:
+            current_assignment = db.session.get(Assignment, self.current_assignment_id)
+            if current_assignment:
+                current = (current_assignment, current_assignment.user)
+        
+        return self._build_dict(self.security_seals, current)
+    
+    @classmethod
+    def to_dict_list(cls, equipment_list, include_current_user=False):
+        """장비 목록 일괄 직렬화 (보안씰/현재 사용자를 목록 단위로 한 번에 조회)"""
+        equipment_ids = [eq.id for eq in equipment_list]
+        if not equipment_ids:
+            return []
+        
+        seals_by_equipment = defaultdict(list)
+        seals = SecuritySeal.query.filter(
+            SecuritySeal.equipment_id.in_(equipment_ids)
+        ).order_by(SecuritySeal.id).all()
+        for seal in seals:
+            seals_by_equipment[seal.equipment_id].append(seal)
+        
+        current_by_equipment = {}
+        assignment_ids = [eq.current_assignment_id for eq in equipment_list if eq.current_assignment_id]
+        if include_current_user and assignment_ids:
+            rows = db.session.query(Assignment, User).join(
+                User, Assignment.user_id == User.id
+            ).filter(Assignment.id.in_(assignment_ids)).all()
+            for assignment, user in rows:
+                current_by_equipment[assignment.equipment_id] = (assignment, user)
+        
+        return [
+            eq._build_dict(seals_by_equipment[eq.id], current_by_equipment.get(eq.id))
+            for eq in equipment_list
+        ]
+    
+    def _build_dict(self, seals, current=None):
         data = {
             'id': self.id,
             'asset_number': self.asset_number,
@@ -69,31 +115,57 @@ class Equipment(db.Model):
             'notes': self.notes,
             'usage_months': self.calculate_usage_months(),
             'usage_years': self.calculate_usage_years(),
-            'security_seals': [seal.to_dict() for seal in self.security_seals],
+            'security_seals': [seal.to_dict() for seal in seals],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
         
-        if include_current_user:
-            current_assignment = Assignment.query.filter_by(
-                equipment_id=self.id,
-                status='사용중'
-            ).first()
-            
-            if current_assignment:
-                data['current_user'] = current_assignment.user.to_dict()
-                data['assignment_date'] = current_assignment.assignment_date.isoformat()
+        if current:
+            assignment, user = current
+            data['current_user'] = user.to_dict()
+            data['assignment_date'] = assignment.assignment_date.isoformat()
         
         return data
     
+    def set_current_assignment(self, assignment):
+        """현재 사용자 컬럼 갱신 (assignment는 flush되어 id가 있어야 함, None이면 해제)"""
+        self.current_assignment_id = assignment.id if assignment else None
+        self.current_user_id = assignment.user_id if assignment else None
+    
+    @classmethod
+    def rebuild_current_holders(cls):
+        """Assignment 테이블 기준으로 전체 장비의 현재 사용자 컬럼 재구성"""
+        active = db.aliased(Assignment)
+        current_assignment_id = db.select(db.func.min(active.id)).where(
+            active.equipment_id == cls.id,
+            active.status == '사용중'
+        ).correlate(cls).scalar_subquery()
+        current_user_id = db.select(Assignment.user_id).where(
+            Assignment.id == current_assignment_id
+        ).scalar_subquery()
+        
+        result = db.session.execute(
+            db.update(cls).values(
+                current_assignment_id=current_assignment_id,
+                current_user_id=current_user_id,
+                updated_at=cls.updated_at
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        return result.rowcount
+    
     def calculate_usage_months(self):
-        if not self.acquisition_date:
-            return 0
-        delta = datetime.now().date() - self.acquisition_date
-        return int(delta.days / 30)
+        return self.usage_months_since(self.acquisition_date)
     
     def calculate_usage_years(self):
         return int(self.calculate_usage_months() / 12)
+    
+    @staticmethod
+    def usage_months_since(acquisition_date):
+        if not acquisition_date:
+            return 0
+        delta = datetime.now().date() - acquisition_date
+        return int(delta.days / 30)
 
 
 class SecuritySeal(db.Model):
@@ -107,21 +179,51 @@ class SecuritySeal(db.Model):
     attached_location = db.Column(db.String(50), nullable=True)
     status = db.Column(db.String(20), default='정상')
     inspection_date = db.Column(db.Date, nullable=True)
+    next_inspection_due = db.Column(db.Date, nullable=True, index=True)  # 다음 점검 예정일 (seal_inspection에서 갱신)
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
     def to_dict(self):
+        return self.row_to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """보안씰 dict - 인스턴스 또는 같은 이름의 컬럼을 가진 조회 결과 행"""
         return {
-            'id': self.id,
-            'seal_number': self.seal_number,
-            'equipment_id': self.equipment_id,
-            'attached_date': self.attached_date.isoformat() if self.attached_date else None,
-            'attached_location': self.attached_location,
-            'status': self.status,
-            'inspection_date': self.inspection_date.isoformat() if self.inspection_date else None,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'id': row.id,
+            'seal_number': row.seal_number,
+            'equipment_id': row.equipment_id,
+            'attached_date': row.attached_date.isoformat() if row.attached_date else None,
+            'attached_location': row.attached_location,
+            'status': row.status,
+            'inspection_date': row.inspection_date.isoformat() if row.inspection_date else None,
+            'next_inspection_due': row.next_inspection_due.isoformat() if row.next_inspection_due else None,
+            'notes': row.notes,
+            'created_at': row.created_at.isoformat() if row.created_at else None
         }
+    
+    @classmethod
+    def select_with_equipment(cls):
+        """보안씰 컬럼 + 장비 요약 컬럼(equipment_ 접두어)을 한 번에 읽는 조회문"""
+        return db.select(
+            *cls.__table__.columns,
+            Equipment.asset_number.label('equipment_asset_number'),
+            Equipment.model_name.label('equipment_model_name'),
+            Equipment.category.label('equipment_category')
+        ).outerjoin(Equipment, cls.equipment_id == Equipment.id)
+    
+    @classmethod
+    def projection_to_dict(cls, row):
+        """select_with_equipment 결과 행을 장비 요약(equipment)이 포함된 dict로 변환"""
+        data = cls.row_to_dict(row)
+        if row.equipment_asset_number is not None:
+            data['equipment'] = {
+                'id': row.equipment_id,
+                'asset_number': row.equipment_asset_number,
+                'model_name': row.equipment_model_name,
+                'category': row.equipment_category
+            }
+        return data
 
 
 class Assignment(db.Model):
@@ -214,6 +316,10 @@ class ChangeLog(db.Model):
     changed_by = db.Column(db.String(50), nullable=True, index=True)
     reason = db.Column(db.Text, nullable=True)
     
+    __table_args__ = (
+        db.Index('ix_change_log_entity_date', 'entity_type', 'entity_id', 'change_date'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -227,13 +333,51 @@ class ChangeLog(db.Model):
             'changed_by': self.changed_by,
             'reason': self.reason
         }
-        
-        
+
+
+class SearchNgram(db.Model):
+    """부분 문자열 검색용 n-gram 색인 (필드 값 단위, search_index 모듈에서 관리)"""
+    __tablename__ = 'search_ngram'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    field = db.Column(db.String(40), nullable=False)  # 예: equipment.asset_number
+    gram = db.Column(db.String(10), nullable=False)
+    value = db.Column(db.String(100), nullable=False)  # 원본 필드 값 (gram은 소문자)
+    
+    __table_args__ = (
+        db.UniqueConstraint('field', 'gram', 'value', name='uq_search_ngram'),
+    )
+
+
+class StatisticsCounter(db.Model):
+    """대시보드 통계 집계 테이블 (dashboard_stats 모듈에서 쓰기 시점에 갱신)"""
+    __tablename__ = 'statistics_counter'
+    
+    metric = db.Column(db.String(30), primary_key=True)  # total_equipment, by_status, ...
+    group_key = db.Column(db.String(100), primary_key=True, default='')  # 합계 지표는 빈 문자열
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class FloorplanFloor(db.Model):
+    '''좌석 배치도 - 층 (항목은 FloorplanSeat/FloorplanFacility의 item_id로 연결)'''
+    __tablename__ = 'floorplan_floor'
+    
+    floor = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=1)  # 저장할 때마다 1 증가 (낙관적 동시성 제어)
+    item_id_counter = db.Column(db.Integer, nullable=False, default=1)  # 다음 항목 id
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
 class FloorplanSeat(db.Model):
     '''좌석 배치도 - 좌석'''
     __tablename__ = 'floorplan_seat'
     
+    __table_args__ = (
+        db.Index('ix_floorplan_seat_floor_item', 'floor', 'item_id', unique=True),
+    )
+    
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    item_id = db.Column(db.Integer, nullable=True)  # 층 안의 항목 id (배치도 데이터의 id, 좌석/시설 공통)
     code = db.Column(db.String(20), nullable=True, index=True)  # 좌석 번호 (예: C-1)
     name = db.Column(db.String(50), nullable=True, index=True)  # 사용자명
     floor = db.Column(db.Integer, nullable=False, default=15, index=True)  # 층 (14, 15, 16)
@@ -261,13 +405,35 @@ class FloorplanSeat(db.Model):
             'height': self.height,
             'user_id': self.user_id
         }
+    
+    def to_item(self):
+        """층 배치도 데이터의 항목 형식"""
+        item = {
+            'id': self.item_id,
+            'type': 'seat',
+            'code': self.code or '',
+            'name': self.name or '',
+            'floor': self.floor,
+            'x': self.x,
+            'y': self.y,
+            'width': self.width,
+            'height': self.height
+        }
+        if self.user_id is not None:
+            item['user_id'] = self.user_id
+        return item
 
 
 class FloorplanFacility(db.Model):
     '''좌석 배치도 - 시설'''
     __tablename__ = 'floorplan_facility'
     
+    __table_args__ = (
+        db.Index('ix_floorplan_facility_floor_item', 'floor', 'item_id', unique=True),
+    )
+    
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    item_id = db.Column(db.Integer, nullable=True)  # 층 안의 항목 id (배치도 데이터의 id, 좌석/시설 공통)
     name = db.Column(db.String(100), nullable=False)
     facility_type = db.Column(db.String(30), nullable=False, default='facility')  # facility, facility-room, facility-equip
     floor = db.Column(db.Integer, nullable=False, default=15, index=True)  # 층 (14, 15, 16)
@@ -289,4 +455,8 @@ class FloorplanFacility(db.Model):
             'y': self.y,
             'width': self.width,
             'height': self.height
-        }
\ No newline at end of file
+        }
+    
+    def to_item(self):
+        """층 배치도 데이터의 항목 형식"""
+        return dict(self.to_dict(), id=self.item_id)
\ No newline at end of file
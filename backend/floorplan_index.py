@@ -0,0 +1,208 @@
+import threading
+from itertools import combinations
+
+# 격자 칸 크기(px) - 좌석(70x50)과 시설 몇 개가 한 칸에 들어가는 정도
+GRID_CELL_SIZE = 200
+# 이보다 많은 칸에 걸치는 큰 항목은 칸에 등록하지 않고 따로 보관하여 항상 비교
+MAX_ITEM_CELLS = 64
+
+
+def item_bounds(item):
+    """항목의 (x0, y0, x1, y1) - 좌표가 숫자가 아니면 None"""
+    try:
+        x = float(item.get('x') or 0)
+        y = float(item.get('y') or 0)
+        width = float(item.get('width') or 0)
+        height = float(item.get('height') or 0)
+    except (TypeError, ValueError):
+        return None
+    return (x, y, x + width, y + height)
+
+
+class GridIndex:
+    """층 항목의 균일 격자 공간 색인
+    
+    각 항목을 겹치는 격자 칸마다 등록해 두고, 영역/점 조회와 겹침 검사에서 해당 칸의 항목만 비교한다.
+    """
+    
+    def __init__(self, items, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.items = []
+        self.bounds = []
+        self.cells = {}
+        self.oversized = []
+        for item in items:
+            bounds = item_bounds(item)
+            if bounds is None:
+                continue
+            index = len(self.items)
+            self.items.append(item)
+            self.bounds.append(bounds)
+            if self._span(*bounds) > MAX_ITEM_CELLS:
+                self.oversized.append(index)
+                continue
+            for cell in self._cells(*bounds):
+                self.cells.setdefault(cell, []).append(index)
+    
+    def _span(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return (int(x1 // size) - int(x0 // size) + 1) * (int(y1 // size) - int(y0 // size) + 1)
+    
+    def _cells(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield (cx, cy)
+    
+    def _candidates(self, x0, y0, x1, y1):
+        # 영역이 색인보다 넓으면 칸을 도는 대신 등록된 칸만 확인
+        size = self.cell_size
+        if self._span(x0, y0, x1, y1) > len(self.cells):
+            cells = [
+                indexes for (cx, cy), indexes in self.cells.items()
+                if x0 // size <= cx <= x1 // size and y0 // size <= cy <= y1 // size
+            ]
+        else:
+            cells = [self.cells[cell] for cell in self._cells(x0, y0, x1, y1) if cell in self.cells]
+        candidates = set(self.oversized)
+        for indexes in cells:
+            candidates.update(indexes)
+        return sorted(candidates)
+    
+    def query_region(self, x0, y0, x1, y1):
+        """영역(경계 포함)과 겹치는 항목"""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        results = []
+        for index in self._candidates(x0, y0, x1, y1):
+            ix0, iy0, ix1, iy1 = self.bounds[index]
+            if ix0 <= x1 and x0 <= ix1 and iy0 <= y1 and y0 <= iy1:
+                results.append(self.items[index])
+        return results
+    
+    def hit_test(self, x, y):
+        """점을 포함하는 항목 (나중에 그려지는, 즉 위에 있는 항목부터)"""
+        return list(reversed(self.query_region(x, y, x, y)))
+    
+    def collisions(self):
+        """서로 겹치는 항목 쌍 (모서리만 맞닿은 경우는 제외)"""
+        candidates = set()
+        for indexes in self.cells.values():
+            candidates.update(combinations(indexes, 2))
+        # 큰 항목은 칸 대신 모든 항목과 비교
+        for index in self.oversized:
+            candidates.update((min(index, other), max(index, other)) for other in range(len(self.items)) if other != index)
+        
+        pairs = []
+        for a, b in sorted(candidates):
+            ax0, ay0, ax1, ay1 = self.bounds[a]
+            bx0, by0, bx1, by1 = self.bounds[b]
+            if ax0 < bx1 and bx0 < ax1 and ay0 < by1 and by0 < ay1:
+                pairs.append((self.items[a], self.items[b]))
+        return pairs
+
+
+# 한글 초성 (유니코드 완성형 음절 순서)
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+SEARCH_GRAM_SIZE = 2
+
+
+def to_choseong(text):
+    """한글 음절을 초성으로 바꾼 문자열 (그 외 문자는 그대로)"""
+    return ''.join(
+        CHOSEONG[(ord(ch) - 0xAC00) // 588] if '가' <= ch <= '힣' else ch
+        for ch in text
+    )
+
+
+def is_choseong_query(query):
+    return bool(query) and all(ch in CHOSEONG for ch in query)
+
+
+class FloorSearchIndex:
+    """층 좌석의 이름/좌석번호 검색 색인과 점유 통계
+    
+    좌석마다 소문자 이름, 소문자 좌석번호, 이름 초성의 1~2글자 조각을 색인해 두고
+    검색어 조각의 교집합으로 후보를 찾은 뒤 부분 문자열을 확인한다.
+    """
+    
+    def __init__(self, items):
+        self.seats = []
+        self.grams = {}
+        total_facilities = 0
+        occupied = 0
+        for item in items:
+            if item.get('type') == 'facility':
+                total_facilities += 1
+            if item.get('type') != 'seat':
+                continue
+            
+            name = item.get('name') or ''
+            if name:
+                occupied += 1
+            keys = (name.lower(), (item.get('code') or '').lower(), to_choseong(name))
+            index = len(self.seats)
+            self.seats.append((item, keys))
+            for key in keys:
+                for gram in self._grams(key):
+                    self.grams.setdefault(gram, set()).add(index)
+        
+        total_seats = len(self.seats)
+        self.stats = {
+            'total_seats': total_seats,
+            'occupied_seats': occupied,
+            'empty_seats': total_seats - occupied,
+            'total_facilities': total_facilities,
+            'occupancy_rate': round(occupied / total_seats * 100, 1) if total_seats else 0
+        }
+    
+    @staticmethod
+    def _grams(text):
+        grams = set(text)
+        grams.update(text[i:i + SEARCH_GRAM_SIZE] for i in range(len(text) - SEARCH_GRAM_SIZE + 1))
+        return grams
+    
+    def search(self, query):
+        """소문자 검색어와 이름/좌석번호가 부분 일치하거나, 초성 검색어와 이름 초성이 부분 일치하는 좌석"""
+        if len(query) <= SEARCH_GRAM_SIZE:
+            candidates = self.grams.get(query, set())
+        else:
+            grams = [query[i:i + SEARCH_GRAM_SIZE] for i in range(len(query) - SEARCH_GRAM_SIZE + 1)]
+            candidate_sets = [self.grams.get(gram, set()) for gram in grams]
+            candidates = set.intersection(*candidate_sets)
+        
+        choseong = is_choseong_query(query)
+        results = []
+        for index in sorted(candidates):
+            item, (name, code, name_choseong) = self.seats[index]
+            if query in name or query in code or (choseong and query in name_choseong):
+                results.append(item)
+        return results
+
+
+# 층별 색인 캐시 {(종류, 층): (층 데이터 객체, 색인)} - 저장소 캐시의 층 데이터가 바뀌면 다시 만듦
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _cached_index(kind, floor_id, floor_data, build):
+    key = (kind, str(floor_id))
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached and cached[0] is floor_data:
+            return cached[1]
+    
+    index = build(floor_data.get('items', []))
+    with _indexes_lock:
+        _indexes[key] = (floor_data, index)
+    return index
+
+
+def get_floor_index(floor_id, floor_data):
+    """층 데이터에 대한 공간 색인 (같은 데이터 객체면 재사용)"""
+    return _cached_index('grid', floor_id, floor_data, GridIndex)
+
+
+def get_floor_search_index(floor_id, floor_data):
+    """층 데이터에 대한 검색/통계 색인 (같은 데이터 객체면 재사용)"""
+    return _cached_index('search', floor_id, floor_data, FloorSearchIndex)
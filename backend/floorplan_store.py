@@ -0,0 +1,463 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from database_models import db, FloorplanFloor, FloorplanSeat, FloorplanFacility
+from utils import bulk_insert
+
+# 기존 JSON 저장소 경로 (migrate-floorplan 명령의 원본)
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+FLOORS_DIR = os.path.join(DATA_DIR, 'floorplan_floors')
+LEGACY_FLOORS_FILE = os.path.join(DATA_DIR, 'floorplan_floors.json')
+FLOOR_FILE_PREFIX = 'floor_'
+FLOOR_FILE_SUFFIX = '.json'
+DEFAULT_FLOOR_IDS = ('14', '15', '16')
+# 다른 작업자가 먼저 저장해 버전이 엇갈렸을 때 다시 시도하는 횟수
+WRITE_RETRIES = 5
+
+# 항목 키 ↔ 테이블 컬럼 (항목 키, 컬럼, 기본값)
+SEAT_FIELDS = (
+    ('code', 'code', ''), ('name', 'name', ''),
+    ('x', 'x', 0), ('y', 'y', 0), ('width', 'width', 70), ('height', 'height', 50)
+)
+FACILITY_FIELDS = (
+    ('name', 'name', ''), ('facilityType', 'facility_type', 'facility'),
+    ('x', 'x', 0), ('y', 'y', 0), ('width', 'width', 100), ('height', 'height', 80)
+)
+
+# 층별 데이터 캐시 {층: ((버전, 수정 시각), data)} - 층 버전이 같으면 항목을 다시 읽지 않음
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def empty_floor():
+    return {'items': [], 'itemIdCounter': 1}
+
+
+def floor_number(floor_id):
+    if not re.fullmatch(r'-?\d+', str(floor_id)):
+        raise ValueError(f'잘못된 층 번호입니다: {floor_id}')
+    return int(floor_id)
+
+
+def _floor_rows(floors=None):
+    """층 행 {층: (floor, version, item_id_counter, updated_at)}"""
+    query = db.select(
+        FloorplanFloor.floor, FloorplanFloor.version,
+        FloorplanFloor.item_id_counter, FloorplanFloor.updated_at
+    )
+    if floors is not None:
+        query = query.where(FloorplanFloor.floor.in_(floors))
+    return {row.floor: row for row in db.session.execute(query)}
+
+
+def _load_items(floors):
+    """층별 항목 목록 {층: [항목]} - 항목 id 순(추가된 순서)으로 정렬"""
+    items = {floor: [] for floor in floors}
+    for model in (FloorplanSeat, FloorplanFacility):
+        rows = model.query.filter(model.floor.in_(floors), model.item_id.isnot(None))
+        for row in rows:
+            items[row.floor].append(row.to_item())
+    for floor_items in items.values():
+        floor_items.sort(key=lambda item: item['id'])
+    return items
+
+
+def _load_floors(floors=None):
+    """층 데이터 {층: data} - 캐시와 버전이 다른 층만 항목을 다시 읽음
+    
+    캐시된 객체를 그대로 반환하므로 호출자는 수정하지 않아야 한다.
+    """
+    rows = _floor_rows(floors)
+    result = {}
+    stale = []
+    with _cache_lock:
+        for floor, row in rows.items():
+            cached = _cache.get(floor)
+            if cached and cached[0] == (row.version, row.updated_at):
+                result[floor] = cached[1]
+            else:
+                stale.append(floor)
+    
+    if stale:
+        items = _load_items(stale)
+        with _cache_lock:
+            for floor in stale:
+                row = rows[floor]
+                data = {'items': items[floor], 'itemIdCounter': row.item_id_counter, 'version': row.version}
+                _cache[floor] = ((row.version, row.updated_at), data)
+                result[floor] = data
+    return result
+
+
+def floor_ids():
+    """저장된 층 목록"""
+    return [str(floor) for floor in sorted(_floor_rows())]
+
+
+def load_floor(floor_id):
+    """층 데이터 로드 (없으면 None)"""
+    floor = floor_number(floor_id)
+    return _load_floors([floor]).get(floor)
+
+
+def load_all_floors():
+    """모든 층 데이터 {층: 데이터} - 층이 하나도 없으면 기본 층을 빈 층으로 반환"""
+    floors = _load_floors()
+    if not floors:
+        return {floor_id: empty_floor() for floor_id in DEFAULT_FLOOR_IDS}
+    return {str(floor): data for floor, data in sorted(floors.items())}
+
+
+class StaleVersionError(ValueError):
+    """요청의 기준 버전이 저장된 층 버전과 다름"""
+    
+    def __init__(self, current_version):
+        super().__init__(f'다른 사용자가 먼저 저장했습니다. (현재 버전 {current_version})')
+        self.current_version = current_version
+
+
+def floor_version(data):
+    return (data or {}).get('version', 0)
+
+
+def floor_stamp(floor_id):
+    """층의 (버전, 수정 시각) - 조건부 응답 ETag용, 층이 없으면 None
+    
+    수정 시각을 함께 넣어 층을 지웠다 다시 만들어 버전이 되돌아간 경우도 구분한다.
+    """
+    floor = floor_number(floor_id)
+    row = _floor_rows([floor]).get(floor)
+    return (row.version, row.updated_at) if row else None
+
+
+def floor_stamps():
+    """모든 층의 {층: (버전, 수정 시각)}"""
+    return {str(floor): (row.version, row.updated_at) for floor, row in sorted(_floor_rows().items())}
+
+
+def _to_int(value, default):
+    if value is None or value == '':
+        return default
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        raise ValueError(f'숫자가 아닌 값입니다: {value}')
+
+
+def _item_rows(floor, data):
+    """층 데이터를 테이블 행으로 변환 - ({item_id: 좌석 행}, {item_id: 시설 행}, itemIdCounter)
+    
+    id가 없는 항목은 itemIdCounter로 부여한다. 좌석이 아닌 항목은 시설로 저장한다.
+    """
+    counter = _to_int(data.get('itemIdCounter'), 1)
+    seats = {}
+    facilities = {}
+    for item in data.get('items', []):
+        item_id = _to_int(item.get('id'), counter)
+        if item_id in seats or item_id in facilities:
+            raise ValueError(f'중복된 항목 id입니다: {item_id}')
+        counter = max(counter, item_id + 1)
+        
+        if item.get('type') == 'seat':
+            rows, fields = seats, SEAT_FIELDS
+        else:
+            rows, fields = facilities, FACILITY_FIELDS
+        row = {'floor': floor, 'item_id': item_id}
+        for key, column, default in fields:
+            value = item.get(key)
+            if isinstance(default, int):
+                row[column] = _to_int(value, default)
+            else:
+                row[column] = default if value is None else str(value)
+        rows[item_id] = row
+    return seats, facilities, counter
+
+
+def _same_content(floor, a, b):
+    """version을 제외한 내용 비교 (테이블에 저장되는 값 기준)"""
+    if a is None or b is None:
+        return a is b
+    return _item_rows(floor, a) == _item_rows(floor, b)
+
+
+def _sync_items(floor, seats, facilities, counter):
+    """층의 좌석/시설 행을 주어진 행과 같게 맞춤 - 바뀐 행만 일괄 UPDATE, 새 행은 multi-row INSERT
+    
+    item_id가 없는 기존 행(이전 전 데이터)은 지우지 않고 counter부터 id를 부여해 남긴다.
+    부여 후의 counter를 반환한다.
+    """
+    now = datetime.utcnow()
+    for model, rows, fields in ((FloorplanSeat, seats, SEAT_FIELDS), (FloorplanFacility, facilities, FACILITY_FIELDS)):
+        columns = [column for _, column, _ in fields]
+        pending = dict(rows)
+        deleted = []
+        updates = []
+        existing = db.session.execute(
+            db.select(model.id, model.item_id, *[getattr(model, column) for column in columns])
+            .where(model.floor == floor)
+            .order_by(model.id)
+        )
+        for row in existing:
+            if row.item_id is None:
+                updates.append({'id': row.id, 'item_id': counter, 'updated_at': now})
+                counter += 1
+                continue
+            wanted = pending.pop(row.item_id, None)
+            if wanted is None:
+                deleted.append(row.id)
+            elif any(getattr(row, column) != wanted[column] for column in columns):
+                updates.append(dict(wanted, id=row.id, updated_at=now))
+        
+        if deleted:
+            db.session.execute(
+                db.delete(model).where(model.id.in_(deleted)),
+                execution_options={'synchronize_session': False}
+            )
+        if updates:
+            db.session.execute(db.update(model), updates)
+        bulk_insert(model, [dict(row, created_at=now, updated_at=now) for row in pending.values()])
+    return counter
+
+
+def _write_floor(floor, data, current_version):
+    """층 버전이 current_version일 때만 버전을 1 올리고 항목을 반영 (커밋은 호출자)
+    
+    저장 후의 itemIdCounter를 반환하고, 그 사이 다른 작업자가 저장했으면 None. 버전 조건부
+    UPDATE가 층 행을 잠그므로 같은 층에 대한 쓰기는 작업자(프로세스/서버)가 달라도 차례로 처리된다.
+    """
+    seats, facilities, counter = _item_rows(floor, data)
+    now = datetime.utcnow()
+    if current_version == 0:
+        # 새 층 - 동시에 만들면 기본 키 중복(IntegrityError)으로 한쪽이 실패
+        db.session.add(FloorplanFloor(floor=floor, version=1, item_id_counter=counter, updated_at=now))
+        db.session.flush()
+    else:
+        result = db.session.execute(
+            db.update(FloorplanFloor)
+            .where(FloorplanFloor.floor == floor, FloorplanFloor.version == current_version)
+            .values(version=current_version + 1, item_id_counter=counter, updated_at=now),
+            execution_options={'synchronize_session': False}
+        )
+        if result.rowcount != 1:
+            return None
+    
+    synced_counter = _sync_items(floor, seats, facilities, counter)
+    if synced_counter != counter:
+        db.session.execute(
+            db.update(FloorplanFloor)
+            .where(FloorplanFloor.floor == floor)
+            .values(item_id_counter=synced_counter),
+            execution_options={'synchronize_session': False}
+        )
+    return synced_counter
+
+
+def save_floor(floor_id, data):
+    """층 하나 저장 - 해당 층의 바뀐 행만 씀, 저장된 데이터(새 버전 포함) 반환"""
+    return update_floor(floor_id, lambda current: data)
+
+
+def update_floor(floor_id, update, base_version=None):
+    """층 데이터를 읽어 update(현재 데이터 사본)의 반환값으로 저장하고 그 값을 반환
+    
+    base_version이 주어지면 저장된 버전과 다를 때 StaleVersionError를 발생시킨다.
+    없으면 다른 작업자와 엇갈린 경우 최신 데이터로 update를 다시 적용한다.
+    """
+    floor = floor_number(floor_id)
+    for _ in range(WRITE_RETRIES):
+        current = load_floor(floor)
+        version = floor_version(current)
+        if base_version is not None and version != base_version:
+            raise StaleVersionError(version)
+        data = update(dict(current) if current is not None else empty_floor())
+        try:
+            counter = _write_floor(floor, data, version)
+        except IntegrityError:
+            counter = None
+        if counter is not None:
+            db.session.commit()
+            if counter != _item_rows(floor, data)[2]:
+                # id를 부여받은 기존 행이 있으면 그 항목까지 포함된 저장 결과를 다시 읽음
+                return dict(load_floor(floor))
+            return dict(data, itemIdCounter=counter, version=version + 1)
+        db.session.rollback()
+    raise StaleVersionError(floor_version(load_floor(floor)))
+
+
+def save_all_floors(floors):
+    """모든 층 저장 - 내용이 바뀐 층만 다시 쓰고, 요청에 없는 층은 삭제 (기존 전체 덮어쓰기와 같은 결과)
+    
+    반환값은 저장 후 층별 버전 {층: 버전}.
+    """
+    floors = {floor_number(floor_id): data for floor_id, data in floors.items()}
+    for _ in range(WRITE_RETRIES):
+        current = _load_floors()
+        versions = {}
+        written = True
+        try:
+            for floor, data in floors.items():
+                version = floor_version(current.get(floor))
+                if not _same_content(floor, current.get(floor), data):
+                    written = _write_floor(floor, data, version) is not None
+                    if not written:
+                        break
+                    version += 1
+                versions[str(floor)] = version
+        except IntegrityError:
+            written = False
+        
+        if written:
+            removed = [floor for floor in current if floor not in floors]
+            if removed:
+                for model in (FloorplanSeat, FloorplanFacility, FloorplanFloor):
+                    db.session.execute(
+                        db.delete(model).where(model.floor.in_(removed)),
+                        execution_options={'synchronize_session': False}
+                    )
+            db.session.commit()
+            return versions
+        db.session.rollback()
+    raise StaleVersionError(None)
+
+
+def touch_floor(floor):
+    """개별 좌석/시설 API로 항목이 바뀐 층의 버전 증가 (커밋은 호출자)"""
+    db.session.execute(
+        db.update(FloorplanFloor)
+        .where(FloorplanFloor.floor == floor)
+        .values(version=FloorplanFloor.version + 1, updated_at=datetime.utcnow()),
+        execution_options={'synchronize_session': False}
+    )
+
+
+def read_json_floors(source=None):
+    """기존 JSON 저장소의 층 데이터 {층: data} (없으면 빈 dict)
+    
+    source는 층별 파일(floor_<층>.json) 디렉터리 또는 단일 floorplan_floors.json 파일.
+    지정하지 않으면 층별 파일 디렉터리가 있으면 그것을, 없으면 단일 파일을 읽는다.
+    """
+    if source is None:
+        source = FLOORS_DIR if os.path.isdir(FLOORS_DIR) else LEGACY_FLOORS_FILE
+    
+    if os.path.isdir(source):
+        floors = {}
+        for name in sorted(os.listdir(source)):
+            if name.startswith(FLOOR_FILE_PREFIX) and name.endswith(FLOOR_FILE_SUFFIX):
+                with open(os.path.join(source, name), 'r', encoding='utf-8') as f:
+                    floors[name[len(FLOOR_FILE_PREFIX):-len(FLOOR_FILE_SUFFIX)]] = json.load(f)
+        return floors
+    
+    if not os.path.exists(source):
+        return {}
+    with open(source, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def adopt_legacy_rows():
+    """item_id가 없는 기존 좌석/시설 행에 층별로 item_id를 부여하고 층 행을 만듦
+    
+    JSON 원본 없이 테이블에만 배치도가 있던 경우의 이전용. 이전한 층 목록을 반환한다.
+    """
+    floors = set()
+    for model in (FloorplanSeat, FloorplanFacility):
+        floors.update(db.session.scalars(db.select(model.floor).where(model.item_id.is_(None)).distinct()))
+    
+    for floor in sorted(floors):
+        counter = max(
+            db.session.scalar(db.select(db.func.max(model.item_id)).where(model.floor == floor)) or 0
+            for model in (FloorplanSeat, FloorplanFacility)
+        ) + 1
+        for model in (FloorplanSeat, FloorplanFacility):
+            for row in model.query.filter(model.floor == floor, model.item_id.is_(None)).order_by(model.id):
+                row.item_id = counter
+                counter += 1
+        
+        floor_row = db.session.get(FloorplanFloor, floor)
+        if floor_row:
+            floor_row.version += 1
+            floor_row.item_id_counter = max(floor_row.item_id_counter, counter)
+        else:
+            db.session.add(FloorplanFloor(floor=floor, version=1, item_id_counter=counter))
+    db.session.commit()
+    return sorted(floors)
+
+
+
+def ensure_migrated():
+    """층이 하나도 없으면 기존 JSON 파일(없으면 item_id 없는 테이블 행)의 배치도를 옮김 (앱 시작 시)
+    
+    이전 전에 편집기 저장으로 층이 먼저 생겨 JSON 배치도가 묻히는 일을 막는다.
+    """
+    if _floor_rows():
+        return
+    try:
+        floors = read_json_floors()
+        if floors:
+            save_all_floors(floors)
+        else:
+            adopt_legacy_rows()
+    except IntegrityError:
+        # 다른 작업자가 동시에 옮긴 경우
+        db.session.rollback()
+    except (ValueError, OSError):
+        db.session.rollback()
+        current_app.logger.exception('배치도 자동 이전 실패 - flask migrate-floorplan으로 다시 시도하세요.')
+
+# 항목 단위 편집 연산에서 바꿀 수 있는 속성
+MOVE_FIELDS = ('x', 'y')
+RESIZE_FIELDS = ('x', 'y', 'width', 'height')
+
+
+def apply_operations(floor, operations):
+    """층 데이터 사본에 항목 단위 연산 목록을 순서대로 적용하여 새 층 데이터 반환
+    
+    연산: {'op': 'add', 'item': {...}}, {'op': 'move', 'id', 'x', 'y'},
+          {'op': 'resize', 'id', 'width', 'height', ['x', 'y']},
+          {'op': 'update', 'id', 'changes': {...}}, {'op': 'delete', 'id'}
+    add의 item에 id가 없으면 itemIdCounter로 부여한다. 하나라도 잘못되면 ValueError (아무것도 적용되지 않음).
+    """
+    items = list(floor.get('items', []))
+    positions = {item.get('id'): index for index, item in enumerate(items)}
+    counter = floor.get('itemIdCounter', 1)
+    deleted = set()
+    
+    def find(operation):
+        item_id = operation.get('id')
+        if item_id not in positions or positions[item_id] in deleted:
+            raise ValueError(f'항목을 찾을 수 없습니다: {item_id}')
+        return positions[item_id]
+    
+    for operation in operations:
+        op = operation.get('op')
+        if op == 'add':
+            item = dict(operation.get('item') or {})
+            if 'id' not in item:
+                item['id'] = counter
+            if item['id'] in positions and positions[item['id']] not in deleted:
+                raise ValueError(f'이미 있는 항목입니다: {item["id"]}')
+            positions[item['id']] = len(items)
+            items.append(item)
+            if isinstance(item['id'], int):
+                counter = max(counter, item['id'] + 1)
+        elif op in ('move', 'resize'):
+            index = find(operation)
+            fields = MOVE_FIELDS if op == 'move' else RESIZE_FIELDS
+            changes = {field: operation[field] for field in fields if field in operation}
+            items[index] = dict(items[index], **changes)
+        elif op == 'update':
+            index = find(operation)
+            changes = dict(operation.get('changes') or {})
+            changes.pop('id', None)
+            items[index] = dict(items[index], **changes)
+        elif op == 'delete':
+            deleted.add(find(operation))
+        else:
+            raise ValueError(f'알 수 없는 연산입니다: {op}')
+    
+    if deleted:
+        items = [item for index, item in enumerate(items) if index not in deleted]
+    return dict(floor, items=items, itemIdCounter=counter)
@@ -0,0 +1,502 @@
+import shutil
+import tempfile
+from datetime import datetime
+import pandas as pd
+from openpyxl import load_workbook
+from database_models import db, Equipment, User, Assignment, SecuritySeal, ChangeLog
+from utils import clean_series, format_padded_series, parse_date_series, bulk_insert
+
+SEAL_COLUMNS = ['보안씰1', '보안씰2', '보안씰3']
+LOOKUP_CHUNK_SIZE = 1000
+
+
+class PendingRow:
+    """일괄 INSERT 대기 중인 신규 행 - ORM 객체처럼 속성으로 다루고, 저장 후 id가 채워짐"""
+    
+    def __init__(self, **values):
+        object.__setattr__(self, 'values', values)
+        object.__setattr__(self, 'id', None)
+    
+    def __getattr__(self, name):
+        try:
+            return self.values[name]
+        except KeyError:
+            raise AttributeError(name)
+    
+    def __setattr__(self, name, value):
+        if name == 'id':
+            object.__setattr__(self, name, value)
+        else:
+            self.values[name] = value
+
+
+class ExcelSheetReader:
+    """엑셀 업로드 스트리밍 리더
+    
+    업로드를 임시 파일로 옮긴 뒤 openpyxl 읽기 전용 모드로 열어, 첫 시트를 행 묶음 단위
+    DataFrame으로 차례로 만든다. 워크북 전체를 메모리에 올리지 않으며, 요청이 끝난 뒤에도
+    (백그라운드 작업) 읽을 수 있도록 임시 파일은 close() 전까지 유지된다.
+    
+    DataFrame의 인덱스는 '시트 행 번호 - 2'이므로 clean_import_frame의 row_num이 실제 행과 같다.
+    값이 모두 빈 행은 건너뛴다.
+    """
+    
+    def __init__(self, file, batch_size=500):
+        self.batch_size = batch_size
+        self._spool = tempfile.TemporaryFile()
+        try:
+            shutil.copyfileobj(getattr(file, 'stream', file), self._spool)
+            self._spool.seek(0)
+            self._workbook = load_workbook(self._spool, read_only=True, data_only=True)
+        except Exception:
+            self._spool.close()
+            raise
+        
+        sheet = self._workbook.active
+        self._rows = sheet.iter_rows(values_only=True)
+        header = next(self._rows, ())
+        self.columns = [
+            str(value).strip() if value is not None else f'Unnamed: {i}'
+            for i, value in enumerate(header)
+        ]
+        # 시트 메타데이터의 범위 기준 추정치 (파일에 따라 없거나 빈 행을 포함할 수 있음)
+        self.estimated_rows = max((sheet.max_row or 1) - 1, 0)
+    
+    def frames(self):
+        """batch_size 행씩 DataFrame 생성"""
+        width = len(self.columns)
+        batch = []
+        index = []
+        for offset, values in enumerate(self._rows):
+            if not any(value is not None and value != '' for value in values):
+                continue
+            values = tuple(values[:width]) + (None,) * (width - len(values))
+            batch.append(values)
+            index.append(offset)
+            if len(batch) >= self.batch_size:
+                yield pd.DataFrame(batch, columns=self.columns, index=index, dtype=object)
+                batch = []
+                index = []
+        if batch:
+            yield pd.DataFrame(batch, columns=self.columns, index=index, dtype=object)
+    
+    def close(self):
+        self._workbook.close()
+        self._spool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def clean_import_frame(df):
+    """엑셀 DataFrame을 컬럼 단위로 한 번에 정리 (행 번호 포함, 없는 컬럼은 None)"""
+    def column(name):
+        if name in df.columns:
+            return clean_series(df[name])
+        return pd.Series(None, index=df.index, dtype=object)
+    
+    cleaned = pd.DataFrame({
+        'row_num': df.index + 2,
+        'asset_number': format_padded_series(column('번호')),
+        'category': column('구분'),
+        'model_name': column('모델 명'),
+        'spec': column('규격'),
+        'acquisition_date': (
+            parse_date_series(df['취득일자']) if '취득일자' in df.columns
+            else pd.Series(None, index=df.index, dtype=object)
+        ),
+        'ip_address': column('IP'),
+        'network_type': column('망분리'),
+        'windows_version': column('win버전'),
+        'notes': column('비고'),
+        'user_name': column('사용자'),
+        'department': column('부서'),
+        'location': column('위치'),
+    }, index=df.index)
+    for seal_col in SEAL_COLUMNS:
+        cleaned[seal_col] = format_padded_series(column(seal_col))
+    
+    # 정리된 값의 None이 NaN으로 바뀌지 않도록 object 컬럼으로 유지
+    return cleaned.astype(object).where(cleaned.notna(), None)
+
+
+def build_import_record(row):
+    """정리된 행을 임포트 레코드로 변환 (번호/구분/모델 명이 없으면 None)"""
+    if not row['asset_number'] or not row['category'] or not row['model_name']:
+        return None
+    
+    # 규격을 비고에 포함
+    spec = row['spec']
+    notes = row['notes']
+    if spec:
+        notes = f"[규격: {spec}] {notes}" if notes else f"[규격: {spec}]"
+    
+    return {
+        'asset_number': row['asset_number'],
+        'category': row['category'],
+        'model_name': row['model_name'],
+        'acquisition_date': row['acquisition_date'] or datetime.now().date(),
+        'ip_address': row['ip_address'],
+        'network_type': row['network_type'],
+        'windows_version': row['windows_version'],
+        'notes': notes,
+        'seals': [row[seal_col] for seal_col in SEAL_COLUMNS if row[seal_col]],
+        'user_name': row['user_name'],
+        'department': row['department'],
+        'location': row['location']
+    }
+
+
+def fetch_existing_asset_numbers(asset_numbers):
+    """DB에 이미 있는 자산번호 집합 (IN 조회)"""
+    asset_numbers = list(asset_numbers)
+    existing = set()
+    for i in range(0, len(asset_numbers), LOOKUP_CHUNK_SIZE):
+        rows = db.session.query(Equipment.asset_number).filter(
+            Equipment.asset_number.in_(asset_numbers[i:i + LOOKUP_CHUNK_SIZE])
+        )
+        existing.update(row[0] for row in rows)
+    return existing
+
+
+def fetch_seal_owners(seal_numbers):
+    """보안씰 번호 -> 할당된 장비 자산번호 (IN 조회, 중복 씰은 먼저 등록된 것 기준)"""
+    seal_numbers = list(seal_numbers)
+    owners = {}
+    for i in range(0, len(seal_numbers), LOOKUP_CHUNK_SIZE):
+        rows = db.session.query(SecuritySeal.seal_number, Equipment.asset_number).join(
+            Equipment, SecuritySeal.equipment_id == Equipment.id
+        ).filter(
+            SecuritySeal.seal_number.in_(seal_numbers[i:i + LOOKUP_CHUNK_SIZE])
+        ).order_by(SecuritySeal.id)
+        for seal_number, asset_number in rows:
+            owners.setdefault(seal_number, asset_number)
+    return owners
+
+
+class ExcelImporter:
+    """엑셀 임포트 엔진
+    
+    청크 단위로 자산번호/보안씰/사용자/현재 할당을 IN 쿼리로 한 번에 조회하고,
+    신규/수정/재할당을 메모리에서 결정한 뒤 multi-row INSERT와 일괄 UPDATE로 저장한다.
+    행 단위 오류 보고와 results 카운터는 행별 처리 방식과 동일하다.
+    """
+    
+    def __init__(self, overwrite=False, changed_by='엑셀 임포트', chunk_size=500):
+        self.overwrite = overwrite
+        self.changed_by = changed_by
+        self.chunk_size = chunk_size
+        self.total_rows = 0
+        self.rows_processed = 0
+        self.results = {
+            'equipment_created': 0,
+            'equipment_updated': 0,
+            'users_created': 0,
+            'assignments_created': 0,
+            'seals_created': 0,
+            'errors': []
+        }
+    
+    def run(self, frames, on_chunk=None):
+        """DataFrame 또는 DataFrame 묶음(ExcelSheetReader.frames 등) 전체 임포트 (commit은 호출자가 수행)
+        
+        on_chunk가 주어지면 청크 저장 직후 on_chunk(importer)를 호출한다.
+        백그라운드 작업은 여기서 청크 단위 커밋과 진행률 갱신을 한다.
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        
+        pending = []
+        for df in frames:
+            rows = clean_import_frame(df).to_dict('records')
+            self.total_rows += len(rows)
+            pending.extend(rows)
+            while len(pending) >= self.chunk_size:
+                self._run_chunk(pending[:self.chunk_size], on_chunk)
+                pending = pending[self.chunk_size:]
+        if pending:
+            self._run_chunk(pending, on_chunk)
+        return self.results
+    
+    def _run_chunk(self, rows, on_chunk):
+        self.process_chunk(rows)
+        self.rows_processed += len(rows)
+        if on_chunk:
+            on_chunk(self)
+    
+    def process_chunk(self, rows):
+        """정리된 행 목록 하나를 조회 → 메모리 처리 → 일괄 저장"""
+        records = []
+        for row in rows:
+            try:
+                record = build_import_record(row)
+                if record:
+                    records.append((row['row_num'], record))
+            except Exception as e:
+                self.results['errors'].append(f'행 {row["row_num"]}: {str(e)}')
+        
+        if not records:
+            return
+        
+        self._prefetch(records)
+        self._new_equipment = []
+        self._new_users = []
+        self._new_seals = []
+        self._new_assignments = []
+        self._seal_moves = []
+        self._logs = []
+        
+        for row_num, record in records:
+            try:
+                self._resolve_row(record)
+            except Exception as e:
+                self.results['errors'].append(f'행 {row_num}: {str(e)}')
+        
+        self._write()
+        
+        # 다음 청크는 DB에서 다시 조회하므로 세션 식별자 맵을 비워 메모리 사용량을 일정하게 유지
+        db.session.expunge_all()
+    
+    def _prefetch(self, records):
+        asset_numbers = {record['asset_number'] for _, record in records}
+        seal_numbers = {seal for _, record in records for seal in record['seals']}
+        user_names = {record['user_name'] for _, record in records if record['user_name']}
+        
+        self._equipment = {
+            eq.asset_number: eq
+            for eq in Equipment.query.filter(Equipment.asset_number.in_(asset_numbers))
+        }
+        
+        self._seals = {}
+        if seal_numbers:
+            seals = SecuritySeal.query.filter(
+                SecuritySeal.seal_number.in_(seal_numbers)
+            ).order_by(SecuritySeal.id)
+            for seal in seals:
+                self._seals.setdefault(seal.seal_number, seal)
+        
+        self._users = {}
+        if user_names:
+            for user in User.query.filter(User.name.in_(user_names)).order_by(User.id):
+                self._users.setdefault((user.name, user.department), user)
+        
+        # 장비별 현재(사용중) 할당 - 자산번호 기준
+        self._current = {}
+        assignment_ids = [eq.current_assignment_id for eq in self._equipment.values() if eq.current_assignment_id]
+        if assignment_ids:
+            assignments = {a.id: a for a in Assignment.query.filter(Assignment.id.in_(assignment_ids))}
+            for asset_number, eq in self._equipment.items():
+                if eq.current_assignment_id in assignments:
+                    self._current[asset_number] = assignments[eq.current_assignment_id]
+        
+        # 보안씰 소유 장비 (이번 청크에서 생성/이동된 씰은 장비 객체로 기록)
+        self._seal_owner = {}
+    
+    def _resolve_row(self, record):
+        asset_number = record['asset_number']
+        equipment = self._equipment.get(asset_number)
+        
+        if equipment is None:
+            # 신규 장비 생성
+            equipment = PendingRow(
+                asset_number=asset_number,
+                category=record['category'],
+                model_name=record['model_name'],
+                acquisition_date=record['acquisition_date'],
+                ip_address=record['ip_address'],
+                network_type=record['network_type'],
+                windows_version=record['windows_version'],
+                status='사용가능',
+                notes=record['notes']
+            )
+            self._equipment[asset_number] = equipment
+            self._new_equipment.append(equipment)
+            self.results['equipment_created'] += 1
+            
+            self._log('equipment', equipment, '신규 장비',
+                      None, f"{asset_number} ({record['model_name']})")
+        
+        elif self.overwrite:
+            # 기존 장비 업데이트
+            equipment.category = record['category']
+            equipment.model_name = record['model_name']
+            equipment.acquisition_date = record['acquisition_date']
+            equipment.ip_address = record['ip_address']
+            equipment.network_type = record['network_type']
+            equipment.windows_version = record['windows_version']
+            if record['notes']:
+                equipment.notes = record['notes']
+            self.results['equipment_updated'] += 1
+            
+            self._log('equipment', equipment, '장비 업데이트',
+                      None, f"{asset_number} 업데이트")
+        
+        # 보안씰 처리
+        for seal_number in record['seals']:
+            existing_seal = self._seals.get(seal_number)
+            
+            if existing_seal is None:
+                seal = PendingRow(seal_number=seal_number, status='정상')
+                self._seals[seal_number] = seal
+                self._seal_owner[seal_number] = equipment
+                self._new_seals.append(seal)
+                self.results['seals_created'] += 1
+            elif self.overwrite and not self._owns_seal(equipment, seal_number):
+                self._seal_owner[seal_number] = equipment
+                if not isinstance(existing_seal, PendingRow):
+                    self._seal_moves.append(existing_seal)
+        
+        # 사용자 처리
+        user_name = record['user_name']
+        department = record['department']
+        location = record['location']
+        
+        if user_name and department:
+            user = self._users.get((user_name, department))
+            
+            if user is None:
+                user = PendingRow(name=user_name, department=department, location=location or '')
+                self._users[(user_name, department)] = user
+                self._new_users.append(user)
+                self.results['users_created'] += 1
+                
+                self._log('user', user, '신규 사용자', None, f"{user_name} ({department})")
+            elif location and user.location != location:
+                user.location = location
+            
+            # 현재 할당 확인
+            current_assignment = self._current.get(asset_number)
+            
+            if current_assignment is None:
+                self._assign(equipment, user, '엑셀 임포트')
+                equipment.status = '사용중'
+                self.results['assignments_created'] += 1
+            elif self.overwrite and not self._holds(current_assignment, user):
+                current_assignment.status = '반납'
+                current_assignment.return_date = datetime.now().date()
+                
+                self._assign(equipment, user, '엑셀 임포트 (재할당)')
+                self.results['assignments_created'] += 1
+    
+    def _owns_seal(self, equipment, seal_number):
+        owner = self._seal_owner.get(seal_number)
+        if owner is not None:
+            return owner is equipment
+        return not isinstance(equipment, PendingRow) and self._seals[seal_number].equipment_id == equipment.id
+    
+    def _holds(self, assignment, user):
+        if isinstance(assignment, PendingRow):
+            return assignment.user is user
+        return not isinstance(user, PendingRow) and assignment.user_id == user.id
+    
+    def _assign(self, equipment, user, reason):
+        assignment = PendingRow(
+            assignment_date=datetime.now().date(),
+            return_date=None,
+            status='사용중',
+            assigned_by=self.changed_by,
+            reason=reason
+        )
+        # 저장 시 id로 바꿀 참조 (현재 할당 비교용 user 포함)
+        object.__setattr__(assignment, 'equipment', equipment)
+        object.__setattr__(assignment, 'user', user)
+        self._current[equipment.asset_number] = assignment
+        self._new_assignments.append(assignment)
+    
+    def _log(self, entity_type, entity, field_name, old_value, new_value):
+        self._logs.append((entity_type, entity, field_name, old_value, new_value))
+    
+    def _write(self):
+        """메모리에서 결정된 변경 사항을 의존 순서대로 일괄 저장"""
+        if self._new_equipment:
+            bulk_insert(Equipment, [eq.values for eq in self._new_equipment])
+            ids = dict(db.session.query(Equipment.asset_number, Equipment.id).filter(
+                Equipment.asset_number.in_([eq.asset_number for eq in self._new_equipment])
+            ))
+            for eq in self._new_equipment:
+                eq.id = ids[eq.asset_number]
+        
+        if self._new_users:
+            bulk_insert(User, [user.values for user in self._new_users])
+            keys = {(user.name, user.department) for user in self._new_users}
+            ids = {}
+            rows = db.session.query(User.id, User.name, User.department).filter(
+                User.name.in_({name for name, _ in keys})
+            ).order_by(User.id)
+            for user_id, name, department in rows:
+                if (name, department) in keys:
+                    ids[(name, department)] = user_id
+            for user in self._new_users:
+                user.id = ids[(user.name, user.department)]
+        
+        for seal in self._seal_moves:
+            seal.equipment_id = self._seal_owner[seal.seal_number].id
+        
+        if self._new_seals:
+            bulk_insert(SecuritySeal, [
+                dict(seal.values, equipment_id=self._seal_owner[seal.seal_number].id)
+                for seal in self._new_seals
+            ])
+        
+        if self._new_assignments:
+            # 반납 처리를 먼저 반영해야 새 할당만 '사용중'으로 조회됨
+            db.session.flush()
+            bulk_insert(Assignment, [
+                dict(assignment.values, equipment_id=assignment.equipment.id, user_id=assignment.user.id)
+                for assignment in self._new_assignments
+            ])
+            self._update_current_holders()
+        
+        if self._logs:
+            now = datetime.utcnow()
+            bulk_insert(ChangeLog, [
+                {
+                    'entity_type': entity_type,
+                    'entity_id': entity.id,
+                    'change_date': now,
+                    'change_type': '엑셀 임포트',
+                    'field_name': field_name,
+                    'old_value': old_value,
+                    'new_value': new_value,
+                    'changed_by': self.changed_by,
+                    'reason': None
+                }
+                for entity_type, entity, field_name, old_value, new_value in self._logs
+            ])
+        
+        db.session.flush()
+    
+    def _update_current_holders(self):
+        """새 할당을 장비의 현재 사용자 컬럼에 반영"""
+        equipment_by_id = {a.equipment.id: a.equipment for a in self._new_assignments}
+        rows = db.session.query(Assignment.id, Assignment.equipment_id, Assignment.user_id).filter(
+            Assignment.equipment_id.in_(equipment_by_id.keys()),
+            Assignment.status == '사용중'
+        ).order_by(Assignment.id)
+        
+        pending_updates = []
+        for assignment_id, equipment_id, user_id in rows:
+            equipment = equipment_by_id[equipment_id]
+            if isinstance(equipment, PendingRow):
+                pending_updates.append({
+                    'b_id': equipment_id,
+                    'b_assignment_id': assignment_id,
+                    'b_user_id': user_id
+                })
+            else:
+                equipment.current_assignment_id = assignment_id
+                equipment.current_user_id = user_id
+        
+        if pending_updates:
+            # 이번 청크에서 INSERT한 장비는 ORM 객체가 아니므로 executemany UPDATE로 갱신
+            table = Equipment.__table__
+            db.session.execute(
+                table.update().where(table.c.id == db.bindparam('b_id')).values(
+                    current_assignment_id=db.bindparam('b_assignment_id'),
+                    current_user_id=db.bindparam('b_user_id')
+                ),
+                pending_updates
+            )
@@ -0,0 +1,119 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from database_models import db
+from import_engine import ExcelImporter
+
+_executor = None
+_executor_lock = threading.Lock()
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class ImportJob:
+    """백그라운드 엑셀 임포트 작업 상태"""
+    
+    def __init__(self, overwrite, changed_by):
+        self.id = uuid.uuid4().hex
+        self.overwrite = overwrite
+        self.changed_by = changed_by
+        self.status = 'queued'  # queued, running, completed, failed
+        self.total_rows = 0
+        self.rows_processed = 0
+        self.results = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+    
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed')
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'overwrite': self.overwrite,
+            'changed_by': self.changed_by,
+            'total_rows': self.total_rows,
+            'rows_processed': self.rows_processed,
+            'results': self.results,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('IMPORT_JOB_WORKERS', 2),
+                thread_name_prefix='excel-import'
+            )
+        return _executor
+
+
+def _expire_jobs(retention):
+    """보관 시간이 지난 완료 작업 정리"""
+    now = datetime.utcnow()
+    with _jobs_lock:
+        expired = [
+            job_id for job_id, job in _jobs.items()
+            if job.finished and (now - job.finished_at).total_seconds() > retention
+        ]
+        for job_id in expired:
+            del _jobs[job_id]
+
+
+def _run_job(app, job, reader):
+    """작업 스레드 본문: 청크마다 커밋하여 긴 트랜잭션을 피함"""
+    with app.app_context():
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        importer = ExcelImporter(
+            overwrite=job.overwrite,
+            changed_by=job.changed_by,
+            chunk_size=app.config.get('IMPORT_CHUNK_SIZE', 500)
+        )
+        
+        def commit_chunk(importer):
+            db.session.commit()
+            job.total_rows = max(job.total_rows, importer.total_rows)
+            job.rows_processed = importer.rows_processed
+            job.results = dict(importer.results, errors=list(importer.results['errors']))
+        
+        try:
+            importer.run(reader.frames(), on_chunk=commit_chunk)
+            job.total_rows = importer.total_rows
+            job.results = importer.results
+            job.status = 'completed'
+        except Exception as e:
+            # 이전 청크는 이미 커밋되었으므로 실패한 청크만 되돌림
+            db.session.rollback()
+            job.error = f'임포트 중 오류 (행 {job.rows_processed}까지 저장됨): {str(e)}'
+            job.status = 'failed'
+        finally:
+            reader.close()
+            job.finished_at = datetime.utcnow()
+
+
+def submit_import(app, reader, overwrite=False, changed_by='엑셀 임포트'):
+    """ExcelSheetReader 임포트를 작업 풀에 등록하고 작업 반환 (리더는 작업이 끝나면 닫힘)"""
+    _expire_jobs(app.config.get('IMPORT_JOB_RETENTION', 3600))
+    
+    job = ImportJob(overwrite, changed_by)
+    job.total_rows = reader.estimated_rows
+    with _jobs_lock:
+        _jobs[job.id] = job
+    _get_executor(app).submit(_run_job, app, job, reader)
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
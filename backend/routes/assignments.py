@@ -30,12 +30,7 @@ def create_assignment():
         return jsonify({'error': '해당 자산번호의 장비를 찾을 수 없습니다.'}), 404
     
     # 이미 할당되어 있는지 확인
-    existing_assignment = Assignment.query.filter_by(
-        equipment_id=equipment.id,
-        status='사용중'
-    ).first()
-    
-    if existing_assignment:
+    if equipment.current_assignment_id:
         return jsonify({'error': '이미 사용중인 장비입니다.'}), 400
     
     # 사용자 찾기
@@ -57,12 +52,14 @@ def create_assignment():
     equipment.status = '사용중'
     
     db.session.add(assignment)
-    db.session.commit()
+    db.session.flush()
+    equipment.set_current_assignment(assignment)
     
     # 이력 기록
     log_change('assignment', assignment.id, '장비 할당', '할당',
                None, f"{user.name} → {equipment.asset_number}",
-               data.get('assigned_by'), data.get('reason'))
+               data.get('assigned_by'), data.get('reason'), auto_commit=False)
+    db.session.commit()
     
     return jsonify(assignment.to_dict(include_details=True)), 201
 
@@ -85,14 +82,15 @@ def return_assignment(id):
     # 장비 상태 변경
     equipment = Equipment.query.get(assignment.equipment_id)
     equipment.status = '사용가능'
-    
-    db.session.commit()
+    if equipment.current_assignment_id == assignment.id:
+        equipment.set_current_assignment(None)
     
     # 이력 기록
     user = User.query.get(assignment.user_id)
     log_change('assignment', assignment.id, '장비 반납', '반납',
                f"{user.name} → {equipment.asset_number}", None,
-               data.get('assigned_by'), data.get('reason'))
+               data.get('assigned_by'), data.get('reason'), auto_commit=False)
+    db.session.commit()
     
     return jsonify(assignment.to_dict(include_details=True))
 
@@ -1,15 +1,26 @@
 from flask import request, jsonify
 from datetime import datetime
 from . import equipment_bp
-from database_models import db, Equipment, User, Assignment, SecuritySeal
-from utils import format_asset_number, format_seal_number, check_seal_duplicate, log_change
+from database_models import db, Equipment, User, SecuritySeal
+from utils import (
+    format_asset_number, format_seal_number, check_seal_duplicates, log_change,
+    keyset_page, cached_count,
+    table_version, change_log_version, data_etag, conditional_json
+)
+from search_index import filter_contains
+from dashboard_stats import get_statistics_snapshot
+
+# 키셋 페이지네이션 정렬 키 (컬럼, 커서 값 변환 함수)
+EQUIPMENT_CURSOR_KEYS = ((Equipment.asset_number, str), (Equipment.id, int))
 
 
 @equipment_bp.route('/equipment', methods=['GET'])
 def get_all_equipment():
-    """전체 장비 목록 조회 (페이지네이션 지원)"""
+    """전체 장비 목록 조회 (페이지네이션 지원, cursor 파라미터가 있으면 (asset_number, id) 키셋 페이지네이션)"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
     
     asset_number = request.args.get('asset_number', '')
     category = request.args.get('category', '')
@@ -21,29 +32,44 @@ def get_all_equipment():
     query = Equipment.query
     
     if asset_number:
-        query = query.filter(Equipment.asset_number.like(f'%{asset_number}%'))
+        query = filter_contains(query, Equipment.asset_number, asset_number)
     if category:
         query = query.filter(Equipment.category == category)
     if status:
         query = query.filter(Equipment.status == status)
     if model_name:
-        query = query.filter(Equipment.model_name.like(f'%{model_name}%'))
+        query = filter_contains(query, Equipment.model_name, model_name)
     
     if user_name or department:
-        query = query.outerjoin(Assignment, 
-            db.and_(Assignment.equipment_id == Equipment.id, Assignment.status == '사용중')
-        ).outerjoin(User, Assignment.user_id == User.id)
+        query = query.join(User, Equipment.current_user_id == User.id)
         
         if user_name:
-            query = query.filter(User.name.like(f'%{user_name}%'))
+            query = filter_contains(query, User.name, user_name)
         if department:
-            query = query.filter(User.department.like(f'%{department}%'))
+            query = filter_contains(query, User.department, department)
+    
+    if cursor is not None:
+        try:
+            equipment_list, next_cursor = keyset_page(query, cursor, per_page, EQUIPMENT_CURSOR_KEYS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        count_key = ('equipment', asset_number, category, status, model_name, user_name, department)
+        total = cached_count(count_key, query, refresh=with_total)
+        
+        return jsonify({
+            'items': Equipment.to_dict_list(equipment_list, include_current_user=True),
+            'next_cursor': next_cursor,
+            'per_page': per_page,
+            'total': total,
+            'total_exact': with_total
+        })
     
     total = query.count()
     equipment_list = query.order_by(Equipment.asset_number).offset((page - 1) * per_page).limit(per_page).all()
     
     return jsonify({
-        'items': [eq.to_dict(include_current_user=True) for eq in equipment_list],
+        'items': Equipment.to_dict_list(equipment_list, include_current_user=True),
         'total': total,
         'page': page,
         'per_page': per_page,
@@ -65,6 +91,19 @@ def get_equipment_by_asset(asset_number):
     return jsonify(equipment.to_dict(include_current_user=True))
 
 
+def seal_duplicate_error(seal_numbers, exclude_equipment_id=None):
+    """이미 다른 장비에 할당된 보안씰이 있으면 첫 번째 번호의 400 응답, 없으면 None"""
+    duplicates = check_seal_duplicates(seal_numbers, exclude_equipment_id=exclude_equipment_id)
+    if not duplicates:
+        return None
+    
+    seal_num, owner = next(iter(duplicates.items()))
+    eq_info = owner['equipment_asset_number'] or 'N/A'
+    return jsonify({
+        'error': f'보안씰 {seal_num}은(는) 이미 장비 {eq_info}에 할당되어 있습니다.'
+    }), 400
+
+
 @equipment_bp.route('/equipment', methods=['POST'])
 def create_equipment():
     """장비 등록"""
@@ -80,15 +119,9 @@ def create_equipment():
     # 보안씰 중복 체크
     if 'seal_numbers' in data and data['seal_numbers']:
         seal_numbers = [s.strip() for s in data['seal_numbers'].split(',') if s.strip()]
-        for seal_num in seal_numbers:
-            formatted_seal_num = format_seal_number(seal_num)
-            existing_seal = check_seal_duplicate(formatted_seal_num)
-            if existing_seal:
-                eq = Equipment.query.get(existing_seal.equipment_id)
-                eq_info = eq.asset_number if eq else 'N/A'
-                return jsonify({
-                    'error': f'보안씰 {formatted_seal_num}은(는) 이미 장비 {eq_info}에 할당되어 있습니다.'
-                }), 400
+        error = seal_duplicate_error(format_seal_number(seal_num) for seal_num in seal_numbers)
+        if error:
+            return error
     
     equipment = Equipment(
         asset_number=formatted_asset_number,
@@ -190,14 +223,9 @@ def update_equipment(id):
         
         # 새로 추가되는 보안씰 중복 체크
         seals_to_add = new_seal_numbers - old_seal_numbers
-        for seal_num in seals_to_add:
-            existing_seal = check_seal_duplicate(seal_num, exclude_equipment_id=id)
-            if existing_seal:
-                eq = Equipment.query.get(existing_seal.equipment_id)
-                eq_info = eq.asset_number if eq else 'N/A'
-                return jsonify({
-                    'error': f'보안씰 {seal_num}은(는) 이미 장비 {eq_info}에 할당되어 있습니다.'
-                }), 400
+        error = seal_duplicate_error(sorted(seals_to_add), exclude_equipment_id=id)
+        if error:
+            return error
         
         if old_seal_numbers != new_seal_numbers:
             # 삭제할 보안씰
@@ -241,8 +269,7 @@ def delete_equipment(id):
     """장비 삭제"""
     equipment = Equipment.query.get_or_404(id)
     
-    active_assignment = Assignment.query.filter_by(equipment_id=id, status='사용중').first()
-    if active_assignment:
+    if equipment.current_assignment_id:
         return jsonify({'error': '사용중인 장비는 삭제할 수 없습니다.'}), 400
     
     db.session.delete(equipment)
@@ -261,66 +288,37 @@ def search_equipment():
     status = request.args.get('status')
     
     if asset_number:
-        query = query.filter(Equipment.asset_number.like(f'%{asset_number}%'))
+        query = filter_contains(query, Equipment.asset_number, asset_number)
     if category:
         query = query.filter(Equipment.category == category)
     if model_name:
-        query = query.filter(Equipment.model_name.like(f'%{model_name}%'))
+        query = filter_contains(query, Equipment.model_name, model_name)
     if status:
         query = query.filter(Equipment.status == status)
     
     equipment_list = query.all()
-    return jsonify([eq.to_dict(include_current_user=True) for eq in equipment_list])
+    return jsonify(Equipment.to_dict_list(equipment_list, include_current_user=True))
 
 
 @equipment_bp.route('/equipment/available', methods=['GET'])
 def get_available_equipment():
-    """사용 가능한 장비 목록 (할당용)"""
-    equipment_list = Equipment.query.filter_by(status='사용가능').order_by(Equipment.asset_number).all()
-    return jsonify([eq.to_dict() for eq in equipment_list])
+    """사용 가능한 장비 목록 (할당용, 데이터와 날짜가 같으면 If-None-Match에 304)"""
+    # usage_months가 오늘 날짜 기준이라 날짜도 ETag에 포함
+    etag = data_etag(
+        datetime.now().date(),
+        table_version(Equipment),
+        table_version(SecuritySeal),
+        change_log_version('equipment', 'security_seal')
+    )
+    
+    def build():
+        equipment_list = Equipment.query.filter_by(status='사용가능').order_by(Equipment.asset_number).all()
+        return Equipment.to_dict_list(equipment_list)
+    
+    return conditional_json(etag, build)
 
 
 @equipment_bp.route('/statistics', methods=['GET'])
 def get_statistics():
-    """대시보드 통계"""
-    total_equipment = Equipment.query.count()
-    total_users = User.query.count()
-    total_seals = SecuritySeal.query.count()
-    active_assignments = Assignment.query.filter_by(status='사용중').count()
-    
-    status_stats = db.session.query(
-        Equipment.status,
-        db.func.count(Equipment.id)
-    ).group_by(Equipment.status).all()
-    
-    category_stats = db.session.query(
-        Equipment.category,
-        db.func.count(Equipment.id)
-    ).group_by(Equipment.category).all()
-    
-    department_stats = db.session.query(
-        User.department,
-        db.func.count(User.id)
-    ).group_by(User.department).all()
-    
-    location_stats = db.session.query(
-        User.location,
-        db.func.count(User.id)
-    ).group_by(User.location).all()
-    
-    seal_status_stats = db.session.query(
-        SecuritySeal.status,
-        db.func.count(SecuritySeal.id)
-    ).group_by(SecuritySeal.status).all()
-    
-    return jsonify({
-        'total_equipment': total_equipment,
-        'total_users': total_users,
-        'total_seals': total_seals,
-        'active_assignments': active_assignments,
-        'by_status': dict(status_stats),
-        'by_category': dict(category_stats),
-        'by_department': dict(department_stats),
-        'by_location': dict(location_stats),
-        'by_seal_status': dict(seal_status_stats)
-    })
\ No newline at end of file
+    """대시보드 통계 (쓰기 시점에 갱신되는 집계 테이블에서 조회)"""
+    return jsonify(get_statistics_snapshot())
@@ -1,60 +1,21 @@
 from flask import request, jsonify
 from . import floorplan_bp
 from database_models import db, FloorplanSeat, FloorplanFacility
-import json
-import os
-
-# 데이터 파일 경로
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-FLOORPLAN_FLOORS_FILE = os.path.join(DATA_DIR, 'floorplan_floors.json')
-
-
-def ensure_data_dir():
-    """데이터 디렉토리 확인 및 생성"""
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
-
-
-def load_floors_data():
-    """층별 배치도 데이터 로드"""
-    ensure_data_dir()
-    if os.path.exists(FLOORPLAN_FLOORS_FILE):
-        try:
-            with open(FLOORPLAN_FLOORS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"층별 데이터 로드 오류: {e}")
-    
-    # 빈 데이터 반환
-    return {
-        "14": {"items": [], "itemIdCounter": 1},
-        "15": {"items": [], "itemIdCounter": 1},
-        "16": {"items": [], "itemIdCounter": 1}
-    }
-
-
-def save_floors_data(data):
-    """층별 배치도 데이터 저장"""
-    ensure_data_dir()
-    try:
-        with open(FLOORPLAN_FLOORS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        print(f"데이터 저장 오류: {e}")
-        return False
+import floorplan_store
+from floorplan_index import get_floor_index, get_floor_search_index
+from utils import data_etag, conditional_json
 
 
 # ========== 층별 API (신규) ==========
 
 @floorplan_bp.route('/floorplan/all', methods=['GET'])
 def get_all_floors():
-    """모든 층의 배치도 데이터 조회"""
+    """모든 층의 배치도 데이터 조회 (층별 버전이 같으면 If-None-Match에 304)"""
     try:
-        data = load_floors_data()
-        return jsonify({
+        etag = data_etag(floorplan_store.floor_stamps())
+        return conditional_json(etag, lambda: {
             'success': True,
-            'floors': data
+            'floors': floorplan_store.load_all_floors()
         })
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
@@ -67,25 +28,30 @@ def save_all_floors():
         data = request.json
         floors_data = data.get('floors', {})
         
-        if save_floors_data(floors_data):
-            return jsonify({'message': '저장되었습니다', 'success': True})
-        else:
-            return jsonify({'error': '저장 실패', 'success': False}), 500
+        versions = floorplan_store.save_all_floors(floors_data)
+        return jsonify({'message': '저장되었습니다', 'versions': versions, 'success': True})
+    except floorplan_store.StaleVersionError as e:
+        return jsonify({'error': str(e), 'success': False}), 409
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
 
 
 @floorplan_bp.route('/floorplan/floor/<int:floor_id>', methods=['GET'])
 def get_floor(floor_id):
-    """특정 층의 배치도 데이터 조회"""
+    """특정 층의 배치도 데이터 조회 (층 버전이 같으면 If-None-Match에 304)"""
     try:
-        data = load_floors_data()
-        floor_data = data.get(str(floor_id), {"items": [], "itemIdCounter": 1})
-        return jsonify({
-            'success': True,
-            'floor': floor_id,
-            'data': floor_data
-        })
+        etag = data_etag(floor_id, floorplan_store.floor_stamp(floor_id))
+        
+        def build():
+            floor_data = floorplan_store.load_floor(floor_id) or floorplan_store.empty_floor()
+            return {
+                'success': True,
+                'floor': floor_id,
+                'version': floorplan_store.floor_version(floor_data),
+                'data': floor_data
+            }
+        
+        return conditional_json(etag, build)
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
 
@@ -94,22 +60,121 @@ def get_floor(floor_id):
 def save_floor(floor_id):
     """특정 층의 배치도 데이터 저장"""
     try:
-        data = load_floors_data()
         floor_data = request.json
-        
-        data[str(floor_id)] = {
+        new_data = {
             'items': floor_data.get('items', []),
             'itemIdCounter': floor_data.get('itemIdCounter', 1)
         }
         
-        if save_floors_data(data):
-            return jsonify({'message': f'{floor_id}층 저장되었습니다', 'success': True})
+        # base_version이 있으면 그 사이 다른 저장이 없었을 때만 저장
+        base_version = floor_data.get('base_version')
+        if base_version is None:
+            saved = floorplan_store.save_floor(floor_id, new_data)
         else:
-            return jsonify({'error': '저장 실패', 'success': False}), 500
+            saved = floorplan_store.update_floor(floor_id, lambda current: new_data, base_version)
+        return jsonify({
+            'message': f'{floor_id}층 저장되었습니다',
+            'version': saved['version'],
+            'success': True
+        })
+    except floorplan_store.StaleVersionError as e:
+        return jsonify({'error': str(e), 'version': e.current_version, 'success': False}), 409
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
 
 
+@floorplan_bp.route('/floorplan/floor/<int:floor_id>', methods=['PATCH'])
+def patch_floor(floor_id):
+    """특정 층의 배치도 항목 단위 변경 (add/move/resize/update/delete)
+    
+    요청: {'base_version': n, 'operations': [...]} - base_version이 저장된 버전과 다르면 409.
+    변경된 항목만 전송하므로 좌석 하나를 옮길 때 층 전체를 보내지 않아도 된다.
+    """
+    data = request.json or {}
+    base_version = data.get('base_version')
+    operations = data.get('operations')
+    if base_version is None or not isinstance(operations, list):
+        return jsonify({'error': 'base_version과 operations가 필요합니다.', 'success': False}), 400
+    
+    try:
+        saved = floorplan_store.update_floor(
+            floor_id,
+            lambda current: floorplan_store.apply_operations(current, operations),
+            base_version
+        )
+    except floorplan_store.StaleVersionError as e:
+        return jsonify({'error': str(e), 'version': e.current_version, 'success': False}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e), 'success': False}), 400
+    except Exception as e:
+        return jsonify({'error': str(e), 'success': False}), 500
+    
+    return jsonify({
+        'success': True,
+        'floor': floor_id,
+        'version': saved['version'],
+        'itemIdCounter': saved['itemIdCounter']
+    })
+
+
+def load_floor_index(floor_id):
+    floor_data = floorplan_store.load_floor(floor_id) or floorplan_store.empty_floor()
+    return get_floor_index(floor_id, floor_data)
+
+
+@floorplan_bp.route('/floorplan/floor/<int:floor_id>/region', methods=['GET'])
+def get_floor_region(floor_id):
+    """영역 조회 - x0, y0, x1, y1 사각형과 겹치는 항목 (뷰포트 단위 로딩용)"""
+    try:
+        bounds = [float(request.args[name]) for name in ('x0', 'y0', 'x1', 'y1')]
+    except (KeyError, ValueError):
+        return jsonify({'error': 'x0, y0, x1, y1 좌표가 필요합니다.', 'success': False}), 400
+    
+    items = load_floor_index(floor_id).query_region(*bounds)
+    return jsonify({
+        'success': True,
+        'floor': floor_id,
+        'items': items,
+        'count': len(items)
+    })
+
+
+@floorplan_bp.route('/floorplan/floor/<int:floor_id>/hit', methods=['GET'])
+def hit_test_floor(floor_id):
+    """점 조회 - (x, y)를 포함하는 항목 (위에 그려진 항목부터)"""
+    try:
+        x = float(request.args['x'])
+        y = float(request.args['y'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'x, y 좌표가 필요합니다.', 'success': False}), 400
+    
+    items = load_floor_index(floor_id).hit_test(x, y)
+    return jsonify({
+        'success': True,
+        'floor': floor_id,
+        'items': items
+    })
+
+
+@floorplan_bp.route('/floorplan/floor/<int:floor_id>/collisions', methods=['GET'])
+def get_floor_collisions(floor_id):
+    """겹침 보고 - 서로 겹치는 항목 쌍"""
+    collisions = [
+        {
+            'items': [a.get('id'), b.get('id')],
+            'types': [a.get('type'), b.get('type')],
+            'names': [a.get('name'), b.get('name')]
+        }
+        for a, b in load_floor_index(floor_id).collisions()
+    ]
+    return jsonify({
+        'success': True,
+        'floor': floor_id,
+        'collisions': collisions,
+        'count': len(collisions)
+    })
+
+
 @floorplan_bp.route('/floorplan/search', methods=['GET'])
 def search_all_floors():
     """전체 층에서 검색"""
@@ -118,20 +183,16 @@ def search_all_floors():
         if not query:
             return jsonify({'results': [], 'success': True})
         
-        data = load_floors_data()
+        data = floorplan_store.load_all_floors()
         results = []
         
+        # 이름/좌석번호/이름 초성(예: 'ㄱㅇㅈ') 색인 조회
         for floor_id, floor_data in data.items():
-            items = floor_data.get('items', [])
-            for item in items:
-                if item.get('type') == 'seat':
-                    name = (item.get('name') or '').lower()
-                    code = (item.get('code') or '').lower()
-                    if query in name or query in code:
-                        results.append({
-                            **item,
-                            'floor': int(floor_id)
-                        })
+            for item in get_floor_search_index(floor_id, floor_data).search(query):
+                results.append({
+                    **item,
+                    'floor': int(floor_id)
+                })
         
         return jsonify({
             'results': results,
@@ -146,22 +207,11 @@ def search_all_floors():
 def get_floor_stats():
     """층별 통계 조회"""
     try:
-        data = load_floors_data()
+        data = floorplan_store.load_all_floors()
         stats = {}
         
         for floor_id, floor_data in data.items():
-            items = floor_data.get('items', [])
-            seats = [i for i in items if i.get('type') == 'seat']
-            facilities = [i for i in items if i.get('type') == 'facility']
-            occupied_seats = [s for s in seats if s.get('name')]
-            
-            stats[floor_id] = {
-                'total_seats': len(seats),
-                'occupied_seats': len(occupied_seats),
-                'empty_seats': len(seats) - len(occupied_seats),
-                'total_facilities': len(facilities),
-                'occupancy_rate': round(len(occupied_seats) / len(seats) * 100, 1) if seats else 0
-            }
+            stats[floor_id] = get_floor_search_index(floor_id, floor_data).stats
         
         return jsonify({
             'stats': stats,
@@ -177,32 +227,16 @@ def get_floor_stats():
 def get_floorplan():
     """배치도 데이터 조회 (기존 API - 15층 반환)"""
     try:
-        data = load_floors_data()
-        floor_data = data.get("15", {"items": [], "itemIdCounter": 1})
+        floor_data = floorplan_store.load_floor(15) or floorplan_store.empty_floor()
         return jsonify(floor_data)
     except Exception as e:
-        # 폴백: DB에서 직접 로드
-        try:
-            seats = FloorplanSeat.query.all()
-            facilities = FloorplanFacility.query.all()
-            
-            items = [seat.to_dict() for seat in seats] + [facility.to_dict() for facility in facilities]
-            max_seat_id = max([s.id for s in seats], default=0)
-            max_facility_id = max([f.id for f in facilities], default=0)
-            
-            return jsonify({
-                'items': items,
-                'itemIdCounter': max(max_seat_id, max_facility_id) + 1
-            })
-        except Exception as e2:
-            return jsonify({'error': str(e2)}), 500
+        return jsonify({'error': str(e)}), 500
 
 
 @floorplan_bp.route('/floorplan', methods=['POST'])
 def save_floorplan():
     """배치도 데이터 저장 (기존 API - 15층에 저장)"""
     try:
-        data = load_floors_data()
         floor_data = request.json
         
         # 15층에 저장
@@ -210,15 +244,11 @@ def save_floorplan():
         for item in items:
             item['floor'] = 15
         
-        data["15"] = {
+        floorplan_store.save_floor(15, {
             'items': items,
             'itemIdCounter': floor_data.get('itemIdCounter', 1)
-        }
-        
-        if save_floors_data(data):
-            return jsonify({'message': '저장되었습니다', 'success': True})
-        else:
-            return jsonify({'error': '저장 실패', 'success': False}), 500
+        })
+        return jsonify({'message': '저장되었습니다', 'success': True})
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
 
@@ -259,6 +289,7 @@ def update_seat(id):
     if 'user_id' in data:
         seat.user_id = data['user_id']
     
+    floorplan_store.touch_floor(seat.floor)
     db.session.commit()
     return jsonify(seat.to_dict())
 
@@ -268,6 +299,7 @@ def delete_seat(id):
     """좌석 삭제"""
     seat = FloorplanSeat.query.get_or_404(id)
     db.session.delete(seat)
+    floorplan_store.touch_floor(seat.floor)
     db.session.commit()
     return jsonify({'message': '삭제되었습니다'}), 200
 
@@ -304,6 +336,7 @@ def update_facility(id):
     if 'height' in data:
         facility.height = data['height']
     
+    floorplan_store.touch_floor(facility.floor)
     db.session.commit()
     return jsonify(facility.to_dict())
 
@@ -313,6 +346,7 @@ def delete_facility(id):
     """시설 삭제"""
     facility = FloorplanFacility.query.get_or_404(id)
     db.session.delete(facility)
+    floorplan_store.touch_floor(facility.floor)
     db.session.commit()
     return jsonify({'message': '삭제되었습니다'}), 200
 
@@ -321,7 +355,7 @@ def delete_facility(id):
 def export_floorplan():
     """배치도 데이터 JSON으로 내보내기"""
     try:
-        data = load_floors_data()
+        data = floorplan_store.load_all_floors()
         return jsonify({
             'floors': data,
             'success': True
@@ -1,43 +1,195 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from datetime import datetime
+from itertools import islice
+import csv
+import io
+import json
 from . import history_bp
 from database_models import db, ChangeLog
+from search_index import filter_contains
+from utils import encode_cursor, decode_cursor, keyset_page
+from change_log_archive import query_archive, iter_archive
+
+EXPORT_FIELDS = [
+    'id', 'entity_type', 'entity_id', 'change_date', 'change_type',
+    'field_name', 'old_value', 'new_value', 'changed_by', 'reason'
+]
+EXPORT_BATCH_SIZE = 1000
+# 키셋 페이지네이션 정렬 키 (컬럼, 커서 값 변환 함수)
+CHANGE_LOG_CURSOR_KEYS = ((ChangeLog.change_date, datetime.fromisoformat), (ChangeLog.id, int))
+
+
+def change_log_filters():
+    """요청 파라미터의 변경 이력 검색 조건"""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    return {
+        'entity_type': request.args.get('entity_type'),
+        'change_type': request.args.get('change_type'),
+        'changed_by': request.args.get('changed_by'),
+        'start_date': datetime.strptime(start_date, '%Y-%m-%d') if start_date else None,
+        'end_date': datetime.strptime(end_date, '%Y-%m-%d') if end_date else None
+    }
+
+
+def filter_change_logs(query, filters):
+    if filters['entity_type']:
+        query = query.filter(ChangeLog.entity_type == filters['entity_type'])
+    if filters['change_type']:
+        query = query.filter(ChangeLog.change_type == filters['change_type'])
+    if filters['changed_by']:
+        query = filter_contains(query, ChangeLog.changed_by, filters['changed_by'])
+    if filters['start_date']:
+        query = query.filter(ChangeLog.change_date >= filters['start_date'])
+    if filters['end_date']:
+        query = query.filter(ChangeLog.change_date <= filters['end_date'])
+    return query
+
+
+def change_log_page(query, cursor, per_page, include_archive=False, **archive_filters):
+    """(change_date, id) 내림차순 키셋 페이지 - DB를 다 읽으면 보관분으로 이어짐"""
+    logs, next_cursor = keyset_page(query, cursor, per_page, CHANGE_LOG_CURSOR_KEYS, descending=True)
+    items = [log.to_dict() for log in logs]
+    
+    # 보관분은 DB의 어떤 이력보다 오래되었으므로 DB 페이지가 모자랄 때만 읽음
+    if include_archive and next_cursor is None:
+        if logs:
+            before = (logs[-1].change_date, logs[-1].id)
+        else:
+            last = decode_cursor(cursor, *[parse for _, parse in CHANGE_LOG_CURSOR_KEYS])
+            before = tuple(last) if last else None
+        items.extend(query_archive(limit=per_page + 1 - len(items), before=before, **archive_filters))
+        if len(items) > per_page:
+            items = items[:per_page]
+            next_cursor = encode_cursor(items[-1]['change_date'], items[-1]['id'])
+    
+    return jsonify({
+        'items': items,
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
 
 
 @history_bp.route('/change-logs', methods=['GET'])
 def get_all_change_logs():
-    """전체 변경 이력 조회"""
-    query = ChangeLog.query
+    """전체 변경 이력 조회
     
-    entity_type = request.args.get('entity_type')
-    change_type = request.args.get('change_type')
-    changed_by = request.args.get('changed_by')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
+    cursor 파라미터가 없으면 최근 500건 목록을, 있으면 (change_date, id) 키셋 페이지를 반환한다.
+    """
+    try:
+        filters = change_log_filters()
+    except ValueError:
+        return jsonify({'error': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400
+    include_archive = request.args.get('include_archive', 'false').lower() == 'true'
+    cursor = request.args.get('cursor')
     
-    if entity_type:
-        query = query.filter(ChangeLog.entity_type == entity_type)
-    if change_type:
-        query = query.filter(ChangeLog.change_type == change_type)
-    if changed_by:
-        query = query.filter(ChangeLog.changed_by.like(f'%{changed_by}%'))
-    if start_date:
-        query = query.filter(ChangeLog.change_date >= datetime.strptime(start_date, '%Y-%m-%d'))
-    if end_date:
-        query = query.filter(ChangeLog.change_date <= datetime.strptime(end_date, '%Y-%m-%d'))
-    
-    logs = query.order_by(ChangeLog.change_date.desc()).limit(500).all()
-    return jsonify([log.to_dict() for log in logs])
+    query = filter_change_logs(ChangeLog.query, filters)
+    
+    if cursor is not None:
+        per_page = request.args.get('per_page', 50, type=int)
+        try:
+            return change_log_page(query, cursor, per_page, include_archive, **filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    logs = [log.to_dict() for log in query.order_by(ChangeLog.change_date.desc()).limit(500)]
+    
+    # 보관분은 DB의 어떤 이력보다 오래되었으므로 남은 건수만큼 뒤에 이어 붙임
+    if include_archive and len(logs) < 500:
+        logs.extend(query_archive(limit=500 - len(logs), **filters))
+    
+    return jsonify(logs)
 
 
 @history_bp.route('/change-logs/entity/<string:entity_type>/<int:entity_id>', methods=['GET'])
 def get_entity_change_logs(entity_type, entity_id):
-    """특정 엔티티의 변경 이력"""
-    logs = ChangeLog.query.filter_by(
+    """특정 엔티티의 변경 이력 (cursor 파라미터가 있으면 키셋 페이지네이션)"""
+    include_archive = request.args.get('include_archive', 'false').lower() == 'true'
+    cursor = request.args.get('cursor')
+    
+    query = ChangeLog.query.filter_by(
         entity_type=entity_type,
         entity_id=entity_id
-    ).order_by(ChangeLog.change_date.desc()).all()
-    return jsonify([log.to_dict() for log in logs])
+    )
+    
+    if cursor is not None:
+        per_page = request.args.get('per_page', 50, type=int)
+        try:
+            return change_log_page(query, cursor, per_page, include_archive,
+                                   entity_type=entity_type, entity_id=entity_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    logs = [log.to_dict() for log in query.order_by(ChangeLog.change_date.desc())]
+    
+    if include_archive:
+        logs.extend(query_archive(entity_type=entity_type, entity_id=entity_id))
+    
+    return jsonify(logs)
+
+
+@history_bp.route('/change-logs/export', methods=['GET'])
+def export_change_logs():
+    """변경 이력 스트리밍 내보내기 (format=ndjson|csv)
+    
+    검색 조건은 /change-logs와 같고 건수 제한이 없다. 서버 측 커서로 EXPORT_BATCH_SIZE 행씩 읽어
+    바로 내보내므로 기간이 길어도 작업자 메모리는 일정하다. include_archive=true이면 보관분도 이어서 내보낸다.
+    """
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format은 ndjson 또는 csv만 지원합니다.'}), 400
+    
+    try:
+        filters = change_log_filters()
+    except ValueError:
+        return jsonify({'error': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400
+    include_archive = request.args.get('include_archive', 'false').lower() == 'true'
+    
+    statement = filter_change_logs(
+        db.select(*[getattr(ChangeLog, field) for field in EXPORT_FIELDS]), filters
+    ).order_by(ChangeLog.change_date.desc(), ChangeLog.id.desc())
+    
+    def iter_rows():
+        result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            data = row._asdict()
+            data['change_date'] = data['change_date'].isoformat() if data['change_date'] else None
+            yield data
+        if include_archive:
+            yield from iter_archive(**filters)
+    
+    def generate():
+        rows = iter_rows()
+        if export_format == 'ndjson':
+            while True:
+                batch = list(islice(rows, EXPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in batch)
+            return
+        
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        buffer.write('\ufeff')  # 엑셀에서 한글이 깨지지 않도록 BOM 추가
+        writer.writeheader()
+        while True:
+            batch = list(islice(rows, EXPORT_BATCH_SIZE))
+            if not batch:
+                break
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    filename = f'change_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv; charset=utf-8'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 
 @history_bp.route('/change-logs/recent', methods=['GET'])
@@ -45,4 +197,4 @@ def get_recent_change_logs():
     """최근 변경 이력 (대시보드용)"""
     limit = request.args.get('limit', 20, type=int)
     logs = ChangeLog.query.order_by(ChangeLog.change_date.desc()).limit(limit).all()
-    return jsonify([log.to_dict() for log in logs])
\ No newline at end of file
+    return jsonify([log.to_dict() for log in logs])
@@ -1,48 +1,106 @@
-from flask import request, jsonify, send_file
+from flask import request, jsonify, send_file, current_app, Response, stream_with_context
 from datetime import datetime
-from io import BytesIO
+from io import BytesIO, StringIO
+import csv
+import tempfile
 import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 from . import imports_bp
 from database_models import db, Equipment, User, Assignment, SecuritySeal
-from utils import (
-    format_asset_number, format_seal_number, clean_value, parse_date, log_change
+from import_jobs import submit_import, get_job
+from import_engine import (
+    ExcelImporter, ExcelSheetReader, SEAL_COLUMNS, clean_import_frame, fetch_existing_asset_numbers, fetch_seal_owners
 )
 
 
+EXPORT_COLUMNS = [
+    '구분', '모델 명', '자산 번호', '취득일자', 'IP', '사용자', '부서', '위치', '보안씰',
+    '사용월수', '사용년수', '망분리', '윈도우 버전', '할당일자'
+]
+EXPORT_PAGE_SIZE = 1000
+
+
+def iter_export_rows(page_size=EXPORT_PAGE_SIZE):
+    """사용중 할당 목록을 할당 id 키셋으로 페이지 단위 조회하여 엑셀 행으로 반환"""
+    query = db.session.query(
+        Assignment.id, Assignment.assignment_date,
+        Equipment.id, Equipment.category, Equipment.model_name, Equipment.asset_number,
+        Equipment.acquisition_date, Equipment.ip_address, Equipment.network_type, Equipment.windows_version,
+        User.name, User.department, User.location
+    ).join(
+        Equipment, Assignment.equipment_id == Equipment.id
+    ).join(
+        User, Assignment.user_id == User.id
+    ).filter(Assignment.status == '사용중').order_by(Assignment.id)
+    
+    last_id = 0
+    while True:
+        page = query.filter(Assignment.id > last_id).limit(page_size).all()
+        if not page:
+            break
+        last_id = page[-1][0]
+        
+        seals_by_equipment = {}
+        seal_rows = db.session.query(SecuritySeal.equipment_id, SecuritySeal.seal_number).filter(
+            SecuritySeal.equipment_id.in_({row[2] for row in page})
+        ).order_by(SecuritySeal.id)
+        for equipment_id, seal_number in seal_rows:
+            seals_by_equipment.setdefault(equipment_id, []).append(seal_number)
+        
+        for (_, assignment_date, equipment_id, category, model_name, asset_number, acquisition_date,
+             ip_address, network_type, windows_version, user_name, department, location) in page:
+            usage_months = Equipment.usage_months_since(acquisition_date)
+            seal_numbers = ', '.join(seals_by_equipment.get(equipment_id, []))
+            yield [
+                category,
+                model_name,
+                asset_number,
+                acquisition_date.isoformat() if acquisition_date else '',
+                ip_address or '-',
+                user_name,
+                department,
+                location,
+                seal_numbers or '-',
+                f"{usage_months}개월",
+                f"{int(usage_months / 12)}년",
+                network_type or '-',
+                windows_version or '-',
+                assignment_date.isoformat() if assignment_date else ''
+            ]
+
+
 @imports_bp.route('/export/excel', methods=['GET'])
 def export_excel():
-    """엑셀 내보내기"""
-    assignments = Assignment.query.filter_by(status='사용중').all()
+    """엑셀 내보내기 (format=xlsx|csv)
     
-    data = []
-    for assignment in assignments:
-        equipment = assignment.equipment
-        user = assignment.user
-        seal_numbers = ', '.join([seal.seal_number for seal in equipment.security_seals])
-        
-        data.append({
-            '구분': equipment.category,
-            '모델 명': equipment.model_name,
-            '자산 번호': equipment.asset_number,
-            '취득일자': equipment.acquisition_date.isoformat() if equipment.acquisition_date else '',
-            'IP': equipment.ip_address or '-',
-            '사용자': user.name,
-            '부서': user.department,
-            '위치': user.location,
-            '보안씰': seal_numbers or '-',
-            '사용월수': f"{equipment.calculate_usage_months()}개월",
-            '사용년수': f"{equipment.calculate_usage_years()}년",
-            '망분리': equipment.network_type or '-',
-            '윈도우 버전': equipment.windows_version or '-',
-            '할당일자': assignment.assignment_date.isoformat() if assignment.assignment_date else ''
-        })
+    xlsx는 write-only 워크북에 페이지 단위로 기록해 메모리만 일정하게 유지하고, 전체 파일을 임시 파일에
+    저장한 뒤 전송하므로 첫 바이트는 저장이 끝나야 나간다. 목록이 매우 크면 format=csv로 페이지마다 바로
+    내보낸다.
+    """
+    export_format = request.args.get('format', 'xlsx').lower()
+    if export_format not in ('xlsx', 'csv'):
+        return jsonify({'error': 'format은 xlsx 또는 csv만 지원합니다.'}), 400
+    if export_format == 'csv':
+        return export_csv()
     
-    df = pd.DataFrame(data)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('전산장비목록')
     
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='전산장비목록')
+    header = []
+    for column in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(sheet, value=column)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
     
+    for row in iter_export_rows():
+        sheet.append(row)
+    
+    # 닫히면 자동 삭제되는 임시 파일에 저장 후 청크 단위로 전송
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
     output.seek(0)
     
     return send_file(
@@ -53,6 +111,30 @@ def export_excel():
     )
 
 
+def export_csv():
+    """사용중 할당 목록을 EXPORT_PAGE_SIZE 행씩 CSV로 스트리밍"""
+    def generate():
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')  # 엑셀에서 한글이 깨지지 않도록 BOM 추가
+        writer.writerow(EXPORT_COLUMNS)
+        for index, row in enumerate(iter_export_rows(), start=1):
+            writer.writerow(row)
+            if index % EXPORT_PAGE_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    filename = f'equipment_list_{datetime.now().strftime("%Y%m%d")}.csv'
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv; charset=utf-8',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
 @imports_bp.route('/import/excel/preview', methods=['POST'])
 def preview_excel_import():
     """엑셀 파일 미리보기"""
@@ -67,95 +149,120 @@ def preview_excel_import():
         return jsonify({'error': '엑셀 파일(.xlsx, .xls)만 지원합니다.'}), 400
     
     try:
-        df = pd.read_excel(file, engine='openpyxl')
-        df.columns = df.columns.str.strip()
-        
+        reader = ExcelSheetReader(file, batch_size=current_app.config.get('IMPORT_CHUNK_SIZE', 500))
+    except Exception as e:
+        return jsonify({'error': f'파일 처리 중 오류: {str(e)}'}), 500
+    
+    try:
         # 필수 컬럼 확인
         required_columns = ['번호', '구분', '모델 명']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in required_columns if col not in reader.columns]
         if missing_columns:
             return jsonify({
                 'error': f'필수 컬럼이 없습니다: {", ".join(missing_columns)}',
-                'found_columns': list(df.columns)
+                'found_columns': reader.columns
             }), 400
         
+        # 화면에 보여줄 앞 10행만 전체 값을 보관하고, 나머지는 판정에 필요한 값만 보관
         preview_data = []
+        valid_rows = []
         errors = []
-        new_count = 0
-        update_count = 0
+        total_rows = 0
+        
+        for df in reader.frames():
+            total_rows += len(df)
+            for row in clean_import_frame(df).to_dict('records'):
+                row_num = row['row_num']
+                
+                asset_number = row['asset_number']
+                if not asset_number:
+                    errors.append(f'행 {row_num}: 번호(자산번호)가 비어있습니다.')
+                    continue
+                
+                category = row['category']
+                if not category:
+                    errors.append(f'행 {row_num}: 구분이 비어있습니다.')
+                    continue
+                
+                model_name = row['model_name']
+                if not model_name:
+                    errors.append(f'행 {row_num}: 모델 명이 비어있습니다.')
+                    continue
+                
+                seals = [row[seal_col] for seal_col in SEAL_COLUMNS if row[seal_col]]
+                valid_rows.append({'row_num': row_num, 'asset_number': asset_number, 'seals': seals})
+                if len(preview_data) >= 10:
+                    continue
+                
+                acquisition_date = row['acquisition_date']
+                
+                preview_data.append({
+                    'row_num': row_num,
+                    'is_new': True,
+                    'asset_number': asset_number,
+                    'category': category,
+                    'model_name': model_name,
+                    'spec': row['spec'],
+                    'acquisition_date': acquisition_date.isoformat() if acquisition_date else None,
+                    'ip_address': row['ip_address'],
+                    'network_type': row['network_type'],
+                    'windows_version': row['windows_version'],
+                    'notes': row['notes'],
+                    'user_name': row['user_name'],
+                    'department': row['department'],
+                    'location': row['location'],
+                    'seals': seals
+                })
+        
+        # 신규/업데이트 여부를 자산번호 IN 조회 한 번으로 판정
+        existing_assets = fetch_existing_asset_numbers({item['asset_number'] for item in valid_rows})
+        for item in preview_data:
+            item['is_new'] = item['asset_number'] not in existing_assets
+        new_count = sum(1 for item in valid_rows if item['asset_number'] not in existing_assets)
+        update_count = len(valid_rows) - new_count
         
-        for idx, row in df.iterrows():
-            row_num = idx + 2
-            
-            asset_number_raw = clean_value(row.get('번호'))
-            if not asset_number_raw:
-                errors.append(f'행 {row_num}: 번호(자산번호)가 비어있습니다.')
-                continue
-            
-            asset_number = format_asset_number(asset_number_raw)
-            
-            category = clean_value(row.get('구분'))
-            if not category:
-                errors.append(f'행 {row_num}: 구분이 비어있습니다.')
-                continue
-            
-            model_name = clean_value(row.get('모델 명'))
-            if not model_name:
-                errors.append(f'행 {row_num}: 모델 명이 비어있습니다.')
-                continue
-            
-            existing_equipment = Equipment.query.filter_by(asset_number=asset_number).first()
-            is_new = existing_equipment is None
-            
-            if is_new:
-                new_count += 1
-            else:
-                update_count += 1
-            
-            user_name = clean_value(row.get('사용자'))
-            department = clean_value(row.get('부서'))
-            location = clean_value(row.get('위치'))
-            
-            seals = []
-            for seal_col in ['보안씰1', '보안씰2', '보안씰3']:
-                seal_val = clean_value(row.get(seal_col))
-                if seal_val:
-                    seals.append(format_seal_number(seal_val))
-            
-            acquisition_date = parse_date(row.get('취득일자'))
-            
-            preview_data.append({
-                'row_num': row_num,
-                'is_new': is_new,
-                'asset_number': asset_number,
-                'category': category,
-                'model_name': model_name,
-                'spec': clean_value(row.get('규격')),
-                'acquisition_date': acquisition_date.isoformat() if acquisition_date else None,
-                'ip_address': clean_value(row.get('IP')),
-                'network_type': clean_value(row.get('망분리')),
-                'windows_version': clean_value(row.get('win버전')),
-                'notes': clean_value(row.get('비고')),
-                'user_name': user_name,
-                'department': department,
-                'location': location,
-                'seals': seals
-            })
+        # 보안씰 충돌: 파일 내 다른 장비와 중복되거나 DB에서 다른 장비에 할당된 씰
+        seal_conflicts = []
+        seal_rows = {}
+        for item in valid_rows:
+            for seal_number in item['seals']:
+                seal_rows.setdefault(seal_number, []).append(item)
+        seal_owners = fetch_seal_owners(seal_rows.keys())
+        
+        for seal_number, items in seal_rows.items():
+            first = items[0]
+            for item in items[1:]:
+                if item['asset_number'] != first['asset_number']:
+                    seal_conflicts.append(
+                        f"행 {item['row_num']}: 보안씰 {seal_number}이(가) 행 {first['row_num']}"
+                        f"(장비 {first['asset_number']})과 중복됩니다."
+                    )
+            owner = seal_owners.get(seal_number)
+            if owner:
+                for item in items:
+                    if item['asset_number'] != owner:
+                        seal_conflicts.append(
+                            f"행 {item['row_num']}: 보안씰 {seal_number}은(는) 이미 장비 {owner}에 할당되어 있습니다."
+                        )
         
         return jsonify({
             'success': True,
-            'total_rows': len(df),
-            'valid_rows': len(preview_data),
+            'total_rows': total_rows,
+            'valid_rows': len(valid_rows),
             'new_count': new_count,
             'update_count': update_count,
             'errors': errors[:20],
             'error_count': len(errors),
-            'preview': preview_data[:10],
-            'columns': list(df.columns)
+            'seal_conflicts': seal_conflicts[:20],
+            'seal_conflict_count': len(seal_conflicts),
+            'preview': preview_data,
+            'columns': reader.columns
         })
-        
+    
     except Exception as e:
         return jsonify({'error': f'파일 처리 중 오류: {str(e)}'}), 500
+    finally:
+        reader.close()
 
 
 @imports_bp.route('/import/excel/execute', methods=['POST'])
@@ -167,159 +274,28 @@ def execute_excel_import():
     file = request.files['file']
     overwrite = request.form.get('overwrite', 'false').lower() == 'true'
     changed_by = request.form.get('changed_by', '엑셀 임포트')
+    run_async = request.form.get('async', 'false').lower() == 'true'
     
     try:
-        df = pd.read_excel(file, engine='openpyxl')
-        df.columns = df.columns.str.strip()
-        
-        results = {
-            'equipment_created': 0,
-            'equipment_updated': 0,
-            'users_created': 0,
-            'assignments_created': 0,
-            'seals_created': 0,
-            'errors': []
-        }
-        
-        for idx, row in df.iterrows():
-            row_num = idx + 2
-            
-            try:
-                asset_number_raw = clean_value(row.get('번호'))
-                if not asset_number_raw:
-                    continue
-                
-                asset_number = format_asset_number(asset_number_raw)
-                category = clean_value(row.get('구분'))
-                model_name = clean_value(row.get('모델 명'))
-                
-                if not category or not model_name:
-                    continue
-                
-                equipment = Equipment.query.filter_by(asset_number=asset_number).first()
-                
-                acquisition_date = parse_date(row.get('취득일자'))
-                if not acquisition_date:
-                    acquisition_date = datetime.now().date()
-                
-                # 규격을 비고에 포함
-                spec = clean_value(row.get('규격'))
-                notes = clean_value(row.get('비고'))
-                if spec:
-                    notes = f"[규격: {spec}] {notes}" if notes else f"[규격: {spec}]"
-                
-                if equipment is None:
-                    # 신규 장비 생성
-                    equipment = Equipment(
-                        asset_number=asset_number,
-                        category=category,
-                        model_name=model_name,
-                        acquisition_date=acquisition_date,
-                        ip_address=clean_value(row.get('IP')),
-                        network_type=clean_value(row.get('망분리')),
-                        windows_version=clean_value(row.get('win버전')),
-                        status='사용가능',
-                        notes=notes
-                    )
-                    db.session.add(equipment)
-                    db.session.flush()
-                    results['equipment_created'] += 1
-                    
-                    log_change('equipment', equipment.id, '엑셀 임포트', '신규 장비',
-                               None, f"{asset_number} ({model_name})", changed_by, auto_commit=False)
-                    
-                elif overwrite:
-                    # 기존 장비 업데이트
-                    equipment.category = category
-                    equipment.model_name = model_name
-                    equipment.acquisition_date = acquisition_date
-                    equipment.ip_address = clean_value(row.get('IP'))
-                    equipment.network_type = clean_value(row.get('망분리'))
-                    equipment.windows_version = clean_value(row.get('win버전'))
-                    if notes:
-                        equipment.notes = notes
-                    results['equipment_updated'] += 1
-                    
-                    log_change('equipment', equipment.id, '엑셀 임포트', '장비 업데이트',
-                               None, f"{asset_number} 업데이트", changed_by, auto_commit=False)
-                
-                # 보안씰 처리
-                for seal_col in ['보안씰1', '보안씰2', '보안씰3']:
-                    seal_val = clean_value(row.get(seal_col))
-                    if seal_val:
-                        seal_number = format_seal_number(seal_val)
-                        existing_seal = SecuritySeal.query.filter_by(seal_number=seal_number).first()
-                        
-                        if existing_seal is None:
-                            seal = SecuritySeal(
-                                seal_number=seal_number,
-                                equipment_id=equipment.id,
-                                status='정상'
-                            )
-                            db.session.add(seal)
-                            results['seals_created'] += 1
-                        elif overwrite and existing_seal.equipment_id != equipment.id:
-                            existing_seal.equipment_id = equipment.id
-                
-                # 사용자 처리
-                user_name = clean_value(row.get('사용자'))
-                department = clean_value(row.get('부서'))
-                location = clean_value(row.get('위치'))
-                
-                if user_name and department:
-                    user = User.query.filter_by(name=user_name, department=department).first()
-                    
-                    if user is None:
-                        user = User(
-                            name=user_name,
-                            department=department,
-                            location=location or ''
-                        )
-                        db.session.add(user)
-                        db.session.flush()
-                        results['users_created'] += 1
-                        
-                        log_change('user', user.id, '엑셀 임포트', '신규 사용자',
-                                   None, f"{user_name} ({department})", changed_by, auto_commit=False)
-                    elif location and user.location != location:
-                        user.location = location
-                    
-                    # 현재 할당 확인
-                    current_assignment = Assignment.query.filter_by(
-                        equipment_id=equipment.id,
-                        status='사용중'
-                    ).first()
-                    
-                    if current_assignment is None:
-                        assignment = Assignment(
-                            equipment_id=equipment.id,
-                            user_id=user.id,
-                            assignment_date=datetime.now().date(),
-                            status='사용중',
-                            assigned_by=changed_by,
-                            reason='엑셀 임포트'
-                        )
-                        db.session.add(assignment)
-                        equipment.status = '사용중'
-                        results['assignments_created'] += 1
-                    elif current_assignment.user_id != user.id and overwrite:
-                        current_assignment.status = '반납'
-                        current_assignment.return_date = datetime.now().date()
-                        
-                        new_assignment = Assignment(
-                            equipment_id=equipment.id,
-                            user_id=user.id,
-                            assignment_date=datetime.now().date(),
-                            status='사용중',
-                            assigned_by=changed_by,
-                            reason='엑셀 임포트 (재할당)'
-                        )
-                        db.session.add(new_assignment)
-                        results['assignments_created'] += 1
-                
-            except Exception as e:
-                results['errors'].append(f'행 {row_num}: {str(e)}')
-                continue
+        reader = ExcelSheetReader(file, batch_size=current_app.config.get('IMPORT_CHUNK_SIZE', 500))
+    except Exception as e:
+        return jsonify({'error': f'임포트 중 오류: {str(e)}'}), 500
+    
+    if run_async:
+        # 작업 풀에 등록하고 즉시 반환, 진행 상황은 /import/jobs/<id>로 조회
+        job = submit_import(
+            current_app._get_current_object(), reader,
+            overwrite=overwrite, changed_by=changed_by
+        )
+        return jsonify({'success': True, 'job': job.to_dict()}), 202
+    
+    try:
+        importer = ExcelImporter(
+            overwrite=overwrite,
+            changed_by=changed_by,
+            chunk_size=current_app.config.get('IMPORT_CHUNK_SIZE', 500)
+        )
+        results = importer.run(reader.frames())
         
         db.session.commit()
         
@@ -327,10 +303,22 @@ def execute_excel_import():
             'success': True,
             'results': results
         })
-        
+    
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'임포트 중 오류: {str(e)}'}), 500
+    finally:
+        reader.close()
+
+
+@imports_bp.route('/import/jobs/<job_id>', methods=['GET'])
+def get_import_job(job_id):
+    """백그라운드 임포트 작업 진행 상황 조회"""
+    job = get_job(job_id)
+    if not job:
+        return jsonify({'error': '임포트 작업을 찾을 수 없습니다.'}), 404
+    
+    return jsonify(job.to_dict())
 
 
 @imports_bp.route('/import/template', methods=['GET'])
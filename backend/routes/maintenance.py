@@ -1,7 +1,23 @@
 from flask import request, jsonify
-from datetime import datetime
+from datetime import date, datetime
 from . import maintenance_bp
-from database_models import db, Equipment, MaintenanceLog, Assignment
+from database_models import db, Equipment, MaintenanceLog
+from utils import keyset_page
+
+# 키셋 페이지네이션 정렬 키 (컬럼, 커서 값 변환 함수)
+MAINTENANCE_CURSOR_KEYS = ((MaintenanceLog.maintenance_date, date.fromisoformat), (MaintenanceLog.id, int))
+
+
+def maintenance_log_page(query, cursor, include_equipment=False):
+    """(maintenance_date, id) 내림차순 키셋 페이지"""
+    per_page = request.args.get('per_page', 50, type=int)
+    logs, next_cursor = keyset_page(query, cursor, per_page, MAINTENANCE_CURSOR_KEYS, descending=True)
+    
+    return jsonify({
+        'items': [log.to_dict(include_equipment=include_equipment) for log in logs],
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
 
 
 @maintenance_bp.route('/maintenance-logs', methods=['GET'])
@@ -23,6 +39,15 @@ def get_all_maintenance_logs():
     if end_date:
         query = query.filter(MaintenanceLog.maintenance_date <= datetime.strptime(end_date, '%Y-%m-%d').date())
     
+    query = query.options(db.joinedload(MaintenanceLog.equipment))
+    
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        try:
+            return maintenance_log_page(query, cursor, include_equipment=True)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
     logs = query.order_by(MaintenanceLog.maintenance_date.desc()).all()
     return jsonify([log.to_dict(include_equipment=True) for log in logs])
 
@@ -85,11 +110,7 @@ def update_maintenance_log(id):
         # 완료되면 장비 상태 변경
         if data['status'] == '완료':
             equipment = Equipment.query.get(log.equipment_id)
-            current_assignment = Assignment.query.filter_by(
-                equipment_id=equipment.id, 
-                status='사용중'
-            ).first()
-            if current_assignment:
+            if equipment.current_assignment_id:
                 equipment.status = '사용중'
             else:
                 equipment.status = '사용가능'
@@ -112,7 +133,14 @@ def delete_maintenance_log(id):
 @maintenance_bp.route('/maintenance-logs/equipment/<int:equipment_id>', methods=['GET'])
 def get_equipment_maintenance_logs(equipment_id):
     """특정 장비의 수리/점검 이력"""
-    logs = MaintenanceLog.query.filter_by(equipment_id=equipment_id).order_by(
-        MaintenanceLog.maintenance_date.desc()
-    ).all()
+    query = MaintenanceLog.query.filter_by(equipment_id=equipment_id)
+    
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        try:
+            return maintenance_log_page(query, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    logs = query.order_by(MaintenanceLog.maintenance_date.desc()).all()
     return jsonify([log.to_dict() for log in logs])
\ No newline at end of file
@@ -1,72 +1,96 @@
-from flask import request, jsonify
-from datetime import datetime
+from flask import request, jsonify, abort, current_app
+from datetime import date, datetime, timedelta
+from collections import Counter
 from . import seals_bp
 from database_models import db, Equipment, SecuritySeal
-from utils import format_seal_number, check_seal_duplicate, log_change
+from utils import (
+    format_seal_number, format_asset_number, check_seal_duplicate, check_seal_duplicates, log_change,
+    keyset_page, expand_seal_range, bulk_insert
+)
+from search_index import filter_contains
+
+# 키셋 페이지네이션 정렬 키 (컬럼, 커서 값 변환 함수)
+SEAL_CURSOR_KEYS = ((SecuritySeal.id, int),)
+DUE_SEAL_CURSOR_KEYS = ((SecuritySeal.next_inspection_due, date.fromisoformat), (SecuritySeal.id, int))
+
+
+def seal_list_response(statement):
+    """보안씰+장비 요약 조회문의 응답 (cursor 파라미터가 없으면 전체 목록, 있으면 id 키셋 페이지)"""
+    cursor = request.args.get('cursor')
+    if cursor is None:
+        rows = db.session.execute(statement.order_by(SecuritySeal.id))
+        return jsonify([SecuritySeal.projection_to_dict(row) for row in rows])
+    
+    per_page = request.args.get('per_page', 50, type=int)
+    try:
+        rows, next_cursor = keyset_page(statement, cursor, per_page, SEAL_CURSOR_KEYS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'items': [SecuritySeal.projection_to_dict(row) for row in rows],
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
 
 
 @seals_bp.route('/security-seals', methods=['GET'])
 def get_all_security_seals():
-    """전체 보안씰 목록 조회"""
-    seals = SecuritySeal.query.all()
-    result = []
-    for seal in seals:
-        seal_data = seal.to_dict()
-        if seal.equipment:
-            seal_data['equipment'] = {
-                'id': seal.equipment.id,
-                'asset_number': seal.equipment.asset_number,
-                'model_name': seal.equipment.model_name,
-                'category': seal.equipment.category
-            }
-        result.append(seal_data)
-    return jsonify(result)
+    """전체 보안씰 목록 조회 (cursor 파라미터가 있으면 키셋 페이지네이션)"""
+    return seal_list_response(SecuritySeal.select_with_equipment())
 
 
 @seals_bp.route('/security-seals/search', methods=['GET'])
 def search_security_seals():
-    """보안씰 검색"""
-    query = SecuritySeal.query
+    """보안씰 검색 (cursor 파라미터가 있으면 키셋 페이지네이션)"""
+    statement = SecuritySeal.select_with_equipment()
     
     seal_number = request.args.get('seal_number')
     status = request.args.get('status')
     asset_number = request.args.get('asset_number')
     
     if seal_number:
-        query = query.filter(SecuritySeal.seal_number.like(f'%{seal_number}%'))
+        statement = filter_contains(statement, SecuritySeal.seal_number, seal_number)
     if status:
-        query = query.filter(SecuritySeal.status == status)
+        statement = statement.where(SecuritySeal.status == status)
     if asset_number:
-        query = query.join(Equipment).filter(Equipment.asset_number.like(f'%{asset_number}%'))
-    
-    seals = query.all()
-    result = []
-    for seal in seals:
-        seal_data = seal.to_dict()
-        if seal.equipment:
-            seal_data['equipment'] = {
-                'id': seal.equipment.id,
-                'asset_number': seal.equipment.asset_number,
-                'model_name': seal.equipment.model_name,
-                'category': seal.equipment.category
-            }
-        result.append(seal_data)
-    return jsonify(result)
+        statement = filter_contains(statement, Equipment.asset_number, asset_number)
+    
+    return seal_list_response(statement)
+
+
+@seals_bp.route('/security-seals/due', methods=['GET'])
+def get_due_security_seals():
+    """다음 점검 예정일이 before(YYYY-MM-DD, 기본 내일) 이전인 보안씰 - (예정일, id) 키셋 페이지"""
+    per_page = request.args.get('per_page', 50, type=int)
+    try:
+        before = request.args.get('before')
+        if before:
+            before = datetime.strptime(before, '%Y-%m-%d').date()
+        else:
+            before = datetime.now().date() + timedelta(days=1)
+        statement = SecuritySeal.select_with_equipment().where(SecuritySeal.next_inspection_due < before)
+        rows, next_cursor = keyset_page(statement, request.args.get('cursor'), per_page, DUE_SEAL_CURSOR_KEYS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'items': [SecuritySeal.projection_to_dict(row) for row in rows],
+        'next_cursor': next_cursor,
+        'per_page': per_page,
+        'before': before.isoformat()
+    })
 
 
 @seals_bp.route('/security-seals/<int:id>', methods=['GET'])
 def get_security_seal(id):
     """특정 보안씰 조회"""
-    seal = SecuritySeal.query.get_or_404(id)
-    seal_data = seal.to_dict()
-    if seal.equipment:
-        seal_data['equipment'] = {
-            'id': seal.equipment.id,
-            'asset_number': seal.equipment.asset_number,
-            'model_name': seal.equipment.model_name,
-            'category': seal.equipment.category
-        }
-    return jsonify(seal_data)
+    row = db.session.execute(
+        SecuritySeal.select_with_equipment().where(SecuritySeal.id == id)
+    ).first()
+    if row is None:
+        abort(404)
+    return jsonify(SecuritySeal.projection_to_dict(row))
 
 
 @seals_bp.route('/security-seals', methods=['POST'])
@@ -121,6 +145,124 @@ def create_security_seal():
     return jsonify(seal_data), 201
 
 
+def bulk_seal_targets(data):
+    """일괄 등록 대상 장비 목록 (요청 순서) - equipment_id, equipment_ids 또는 asset_numbers"""
+    if data.get('equipment_id') is not None:
+        equipment_ids = [data['equipment_id']]
+    else:
+        equipment_ids = data.get('equipment_ids') or []
+    asset_numbers = [format_asset_number(str(a).strip()) for a in data.get('asset_numbers') or []]
+    if not equipment_ids and not asset_numbers:
+        raise ValueError('equipment_id, equipment_ids 또는 asset_numbers가 필요합니다.')
+    
+    if equipment_ids:
+        found = {eq.id: eq for eq in Equipment.query.filter(Equipment.id.in_(equipment_ids))}
+        missing = [str(eq_id) for eq_id in equipment_ids if eq_id not in found]
+        targets = [found.get(eq_id) for eq_id in equipment_ids]
+    else:
+        found = {eq.asset_number: eq for eq in Equipment.query.filter(Equipment.asset_number.in_(asset_numbers))}
+        missing = [asset_number for asset_number in asset_numbers if asset_number not in found]
+        targets = [found.get(asset_number) for asset_number in asset_numbers]
+    
+    if missing:
+        raise LookupError(f'장비를 찾을 수 없습니다: {", ".join(missing[:10])}')
+    return targets
+
+
+@seals_bp.route('/security-seals/bulk', methods=['POST'])
+def bulk_create_security_seals():
+    """보안씰 일괄 등록 - 번호 범위(start/end) 또는 목록(seal_numbers)을 장비에 번호 순서대로 배정"""
+    data = request.json or {}
+    limit = current_app.config.get('SEAL_BULK_LIMIT', 5000)
+    
+    try:
+        if data.get('start') is not None or data.get('end') is not None:
+            seal_numbers = expand_seal_range(data.get('start'), data.get('end'), limit=limit)
+        else:
+            seal_numbers = data.get('seal_numbers') or []
+            if isinstance(seal_numbers, str):
+                seal_numbers = seal_numbers.split(',')
+            seal_numbers = [format_seal_number(str(s).strip()) for s in seal_numbers if str(s).strip()]
+        if not seal_numbers:
+            raise ValueError('보안씰 번호가 필요합니다.')
+        if len(seal_numbers) > limit:
+            raise ValueError(f'한 번에 등록할 수 있는 보안씰은 최대 {limit}개입니다.')
+        
+        attached_date = datetime.utcnow().date()
+        if data.get('attached_date'):
+            attached_date = datetime.strptime(data['attached_date'], '%Y-%m-%d').date()
+        
+        targets = bulk_seal_targets(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    repeated = sorted(seal_number for seal_number, count in Counter(seal_numbers).items() if count > 1)
+    if repeated:
+        return jsonify({'error': f'요청에 중복된 보안씰 번호가 있습니다: {", ".join(repeated[:10])}'}), 400
+    
+    # 번호 순서대로 장비에 배정
+    if len(targets) == 1:
+        owners = targets * len(seal_numbers)
+    else:
+        per_equipment = data.get('per_equipment') or 1
+        if not isinstance(per_equipment, int) or len(targets) * per_equipment != len(seal_numbers):
+            return jsonify({
+                'error': f'보안씰 {len(seal_numbers)}개를 장비 {len(targets)}대에 {per_equipment}개씩 나눌 수 없습니다.'
+            }), 400
+        owners = [equipment for equipment in targets for _ in range(per_equipment)]
+    
+    duplicates = check_seal_duplicates(seal_numbers)
+    if duplicates:
+        return jsonify({
+            'error': f'이미 등록된 보안씰이 {len(duplicates)}개 있습니다.',
+            'duplicates': [
+                {'seal_number': seal_number, **owner} for seal_number, owner in duplicates.items()
+            ]
+        }), 400
+    
+    now = datetime.utcnow()
+    bulk_insert(SecuritySeal, [
+        {
+            'seal_number': seal_number,
+            'equipment_id': equipment.id,
+            'attached_date': attached_date,
+            'attached_location': data.get('attached_location'),
+            'status': data.get('status', '정상'),
+            'inspection_date': None,
+            'notes': data.get('notes'),
+            'created_at': now
+        }
+        for seal_number, equipment in zip(seal_numbers, owners)
+    ])
+    
+    # 저장된 id 조회 (방금 중복이 없음을 확인한 번호들)
+    seal_ids = {}
+    for i in range(0, len(seal_numbers), 1000):
+        seal_ids.update(db.session.execute(
+            db.select(SecuritySeal.seal_number, SecuritySeal.id)
+            .where(SecuritySeal.seal_number.in_(seal_numbers[i:i + 1000]))
+            .order_by(SecuritySeal.id)
+        ).all())
+    
+    items = []
+    for seal_number, equipment in zip(seal_numbers, owners):
+        log_change('security_seal', seal_ids[seal_number], '보안씰 등록', '신규 보안씰',
+                   None, f"{seal_number} → 장비({equipment.asset_number})",
+                   data.get('changed_by'), data.get('reason'), auto_commit=False)
+        items.append({
+            'id': seal_ids[seal_number],
+            'seal_number': seal_number,
+            'equipment_id': equipment.id,
+            'equipment_asset_number': equipment.asset_number
+        })
+    
+    db.session.commit()
+    
+    return jsonify({'success': True, 'created': len(items), 'items': items}), 201
+
+
 @seals_bp.route('/security-seals/<int:id>', methods=['PUT'])
 def update_security_seal(id):
     """보안씰 수정"""
@@ -262,4 +404,45 @@ def check_seal_duplicate_api():
     return jsonify({
         'duplicate': False,
         'seal_number': formatted_seal_number
+    })
+
+
+@seals_bp.route('/security-seals/check-duplicates', methods=['POST'])
+def check_seal_duplicates_api():
+    """보안씰 중복 일괄 체크 API
+    
+    요청: {'seal_numbers': [...] 또는 '0001,0002', 'exclude_equipment_id': (선택)}
+    번호마다 check-duplicate와 같은 형식의 결과를 입력 순서대로 반환한다 (조회 1회).
+    """
+    data = request.json or {}
+    seal_numbers = data.get('seal_numbers') or []
+    if isinstance(seal_numbers, str):
+        seal_numbers = seal_numbers.split(',')
+    seal_numbers = [format_seal_number(str(s).strip()) for s in seal_numbers if str(s).strip()]
+    
+    if not seal_numbers:
+        return jsonify({'error': '보안씰 번호가 필요합니다.'}), 400
+    
+    duplicates = check_seal_duplicates(seal_numbers, exclude_equipment_id=data.get('exclude_equipment_id'))
+    
+    results = []
+    for seal_number in dict.fromkeys(seal_numbers):
+        owner = duplicates.get(seal_number)
+        if owner:
+            results.append({
+                'duplicate': True,
+                'seal_number': seal_number,
+                'equipment_asset_number': owner['equipment_asset_number'],
+                'equipment_id': owner['equipment_id']
+            })
+        else:
+            results.append({
+                'duplicate': False,
+                'seal_number': seal_number
+            })
+    
+    return jsonify({
+        'results': results,
+        'duplicate_count': len(duplicates),
+        'has_duplicates': bool(duplicates)
     })
\ No newline at end of file
@@ -1,14 +1,16 @@
 from flask import request, jsonify
 from . import users_bp
 from database_models import db, User, Assignment
-from utils import log_change
+from utils import log_change, table_version, change_log_version, data_etag, conditional_json
+from search_index import filter_contains
 
 
 @users_bp.route('/users', methods=['GET'])
 def get_all_users():
-    """전체 사용자 목록 조회"""
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    """전체 사용자 목록 조회 (사용자 테이블이 바뀌지 않았으면 If-None-Match에 304)"""
+    version = table_version(User)
+    etag = data_etag(version, change_log_version('user'))
+    return conditional_json(etag, lambda: [user.to_dict() for user in User.query.all()], version[2])
 
 
 @users_bp.route('/users/<int:id>', methods=['GET'])
@@ -32,10 +34,11 @@ def create_user():
     )
     
     db.session.add(user)
-    db.session.commit()
+    db.session.flush()
     
     log_change('user', user.id, '사용자 등록', '신규 사용자', None, 
-               f"{user.name} ({user.department})", data.get('changed_by'))
+               f"{user.name} ({user.department})", data.get('changed_by'), auto_commit=False)
+    db.session.commit()
     
     return jsonify(user.to_dict()), 201
 
@@ -63,11 +66,11 @@ def update_user(id):
                 changes[korean_name] = (old_value, new_value)
                 setattr(user, field, new_value)
     
-    db.session.commit()
-    
     for field_name, (old_val, new_val) in changes.items():
         log_change('user', id, '사용자 정보변경', field_name, str(old_val), 
-                   str(new_val), data.get('changed_by'), data.get('reason'))
+                   str(new_val), data.get('changed_by'), data.get('reason'), auto_commit=False)
+    
+    db.session.commit()
     
     return jsonify(user.to_dict())
 
@@ -96,11 +99,11 @@ def search_users():
     location = request.args.get('location')
     
     if name:
-        query = query.filter(User.name.like(f'%{name}%'))
+        query = filter_contains(query, User.name, name)
     if department:
-        query = query.filter(User.department.like(f'%{department}%'))
+        query = filter_contains(query, User.department, department)
     if location:
-        query = query.filter(User.location.like(f'%{location}%'))
+        query = filter_contains(query, User.location, location)
     
     users = query.all()
     return jsonify([user.to_dict() for user in users])
\ No newline at end of file
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event
+from database_models import db, SecuritySeal
+
+# 점검 대상에서 제외하는 상태 (다음 점검 예정일 없음)
+INACTIVE_STATUSES = ('분실', '폐기')
+RECOMPUTE_BATCH_SIZE = 1000
+
+
+def inspection_interval():
+    """보안씰 점검 주기 (SEAL_INSPECTION_INTERVAL_DAYS 설정, 기본 180일)"""
+    return timedelta(days=current_app.config.get('SEAL_INSPECTION_INTERVAL_DAYS', 180))
+
+
+def next_inspection_due(status, attached_date, inspection_date, interval=None):
+    """다음 점검 예정일 - 마지막 점검일(없으면 부착일) + 점검 주기, 점검 대상이 아니면 None"""
+    if status in INACTIVE_STATUSES:
+        return None
+    base = inspection_date or attached_date
+    if base is None:
+        return None
+    if isinstance(base, datetime):
+        base = base.date()
+    return base + (interval or inspection_interval())
+
+
+def fill_next_inspection_due(rows):
+    """ORM flush를 거치지 않고 저장할 보안씰 행(dict 목록)에 다음 점검 예정일 채움
+    
+    부착일 키가 없는 행은 컬럼 기본값과 같은 오늘(UTC)을 부착일로 함께 채운다.
+    """
+    interval = inspection_interval()
+    today = datetime.utcnow().date()
+    for row in rows:
+        if 'attached_date' not in row:
+            row['attached_date'] = today
+        row['next_inspection_due'] = next_inspection_due(
+            row.get('status'), row.get('attached_date'), row.get('inspection_date'), interval
+        )
+
+
+@event.listens_for(SecuritySeal, 'before_insert')
+def _set_due_on_insert(mapper, connection, seal):
+    # 부착일 기본값(datetime.utcnow)은 INSERT 실행 시점에 채워지므로 같은 시계로 미리 반영
+    attached_date = seal.attached_date or datetime.utcnow().date()
+    seal.next_inspection_due = next_inspection_due(seal.status or '정상', attached_date, seal.inspection_date)
+
+
+@event.listens_for(SecuritySeal, 'before_update')
+def _set_due_on_update(mapper, connection, seal):
+    seal.next_inspection_due = next_inspection_due(seal.status, seal.attached_date, seal.inspection_date)
+
+
+def recompute_inspection_due():
+    """전체 보안씰의 다음 점검 예정일 재계산 (점검 주기 설정 변경/기존 데이터 채우기용)
+    
+    바뀐 행만 RECOMPUTE_BATCH_SIZE개씩 일괄 UPDATE하며, 갱신한 행 수를 반환한다.
+    """
+    interval = inspection_interval()
+    rows = db.session.execute(
+        db.select(
+            SecuritySeal.id, SecuritySeal.status, SecuritySeal.attached_date,
+            SecuritySeal.inspection_date, SecuritySeal.next_inspection_due
+        )
+    ).all()
+    
+    updates = []
+    for row in rows:
+        due = next_inspection_due(row.status, row.attached_date, row.inspection_date, interval)
+        if due != row.next_inspection_due:
+            updates.append({'id': row.id, 'next_inspection_due': due})
+    
+    for i in range(0, len(updates), RECOMPUTE_BATCH_SIZE):
+        db.session.execute(db.update(SecuritySeal), updates[i:i + RECOMPUTE_BATCH_SIZE])
+    return len(updates)
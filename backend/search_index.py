@@ -0,0 +1,169 @@
+from collections import defaultdict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database_models import db, Equipment, User, SecuritySeal, ChangeLog, SearchNgram
+
+# 한글 이름/부서가 2~3자인 경우가 많아 bigram 사용
+NGRAM_SIZE = 2
+
+# 색인 대상 필드 (모델 -> 컬럼명)
+INDEXED_COLUMNS = {
+    Equipment: ('asset_number', 'model_name'),
+    User: ('name', 'department', 'location'),
+    SecuritySeal: ('seal_number',),
+    ChangeLog: ('changed_by',),
+}
+
+INSERT_CHUNK_SIZE = 1000
+
+# 필드 전체 색인이 끝났음을 표시하는 행의 gram/value (make_grams는 빈 gram을 만들지 않음)
+BUILT_MARKER = ''
+
+# 완료 표시를 확인한 필드 (프로세스별) - 앱은 완료 표시를 지우지 않으므로 앱 시작 시(ensure_index)에만 다시 확인
+_built_fields = set()
+
+
+def field_key(column):
+    """색인 필드 키 (예: Equipment.asset_number -> 'equipment.asset_number')"""
+    return f'{column.class_.__tablename__}.{column.key}'
+
+
+def make_grams(text):
+    """n-gram 집합 생성 (NGRAM_SIZE보다 짧으면 값 자체를 하나의 gram으로 사용)"""
+    text = text.lower()
+    if len(text) < NGRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def index_values(field, values, connection=None):
+    """필드 값들을 색인에 추가 (이미 색인된 값은 건너뜀)"""
+    values = {str(v) for v in values if v}
+    if not values:
+        return 0
+    
+    if connection is None:
+        connection = db.session.connection()
+    
+    table = SearchNgram.__table__
+    existing = set()
+    value_list = list(values)
+    for i in range(0, len(value_list), INSERT_CHUNK_SIZE):
+        chunk = value_list[i:i + INSERT_CHUNK_SIZE]
+        rows = connection.execute(
+            db.select(table.c.value).distinct().where(table.c.field == field, table.c.value.in_(chunk))
+        )
+        existing.update(row[0] for row in rows)
+    
+    rows = [
+        {'field': field, 'gram': gram, 'value': value}
+        for value in values - existing
+        for gram in make_grams(value)
+    ]
+    # 대소문자/후행 공백만 다른 값은 MySQL collation상 같은 값이므로 무시된다
+    insert = table.insert().prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite')
+    for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+        connection.execute(insert, rows[i:i + INSERT_CHUNK_SIZE])
+    return len(values - existing)
+
+
+def index_rows(model, rows):
+    """ORM flush를 거치지 않고 저장된 행(dict 목록)의 색인 대상 값을 색인"""
+    for column_name in INDEXED_COLUMNS.get(model, ()):
+        index_values(field_key(getattr(model, column_name)), {row.get(column_name) for row in rows})
+
+
+def mark_built(field, connection=None):
+    """필드 전체 색인 완료 표시"""
+    if connection is None:
+        connection = db.session.connection()
+    insert = SearchNgram.__table__.insert().prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite')
+    connection.execute(insert, {'field': field, 'gram': BUILT_MARKER, 'value': BUILT_MARKER})
+
+
+def is_built(field):
+    """필드 전체 색인 완료 여부 (완료 전에는 색인에 없는 기존 행이 있을 수 있음)"""
+    if field in _built_fields:
+        return True
+    built = db.session.query(
+        db.select(SearchNgram.id).where(
+            SearchNgram.field == field,
+            SearchNgram.gram == BUILT_MARKER,
+            SearchNgram.value == BUILT_MARKER
+        ).exists()
+    ).scalar()
+    if built:
+        _built_fields.add(field)
+    return built
+
+
+def filter_contains(query, column, term):
+    """column LIKE '%term%' 필터를 n-gram 색인 조회 후 후보 값에만 적용
+    
+    색인에는 gram 포함 여부만 기록되므로 순서까지 맞는지는 LIKE로 다시 확인한다.
+    검색어가 NGRAM_SIZE보다 짧거나 필드 색인이 아직 완료되지 않았으면 기존 LIKE 검색으로 처리한다.
+    """
+    like = column.like(f'%{term}%')
+    if len(term) < NGRAM_SIZE or not is_built(field_key(column)):
+        return query.filter(like)
+    
+    grams = make_grams(term)
+    matching_values = db.select(SearchNgram.value).where(
+        SearchNgram.field == field_key(column),
+        SearchNgram.gram.in_(grams)
+    ).group_by(SearchNgram.value).having(
+        db.func.count(db.distinct(SearchNgram.gram)) == len(grams)
+    )
+    return query.filter(column.in_(matching_values), like)
+
+
+def build_field(column):
+    """필드의 기존 값 전체를 색인하고 완료 표시"""
+    field = field_key(column)
+    values = [row[0] for row in db.session.query(column).distinct()]
+    count = index_values(field, values)
+    mark_built(field)
+    return count
+
+
+def rebuild_index():
+    """색인 전체 재구성 (삭제/변경으로 남은 이전 값 정리 포함)"""
+    counts = {}
+    db.session.execute(SearchNgram.__table__.delete())
+    for model, columns in INDEXED_COLUMNS.items():
+        for column_name in columns:
+            column = getattr(model, column_name)
+            counts[field_key(column)] = build_field(column)
+    return counts
+
+
+def ensure_index():
+    """색인 완료 표시가 없는 필드만 기존 데이터로 색인 (앱 시작 시, SQL로 직접 넣은 데이터 대비)"""
+    _built_fields.clear()
+    counts = {}
+    for model, columns in INDEXED_COLUMNS.items():
+        for column_name in columns:
+            column = getattr(model, column_name)
+            if not is_built(field_key(column)):
+                counts[field_key(column)] = build_field(column)
+    return counts
+
+
+@event.listens_for(Session, 'after_flush')
+def _index_flushed_values(session, flush_context):
+    """flush된 신규/변경 객체의 색인 대상 값을 같은 트랜잭션에서 색인"""
+    pending = defaultdict(set)
+    for obj in list(session.new) + list(session.dirty):
+        columns = INDEXED_COLUMNS.get(type(obj))
+        if not columns:
+            continue
+        state = db.inspect(obj)
+        for column_name in columns:
+            added = state.attrs[column_name].history.added
+            if added:
+                pending[field_key(getattr(type(obj), column_name))].update(added)
+    
+    if pending:
+        connection = session.connection()
+        for field, values in pending.items():
+            index_values(field, values, connection)
@@ -0,0 +1,67 @@
+import io
+import os
+import sys
+import pandas as pd
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+# app 모듈은 import 시점에 기본 설정으로 앱을 만들므로 먼저 테스트용 DB로 바꿈
+Config.SQLALCHEMY_DATABASE_URI = 'sqlite://'
+Config.SQLALCHEMY_ENGINE_OPTIONS = {}
+Config.STATISTICS_RECONCILE_INTERVAL = 0
+
+from app import create_app
+from database_models import db
+
+
+class TestConfig(Config):
+    TESTING = True
+
+
+@pytest.fixture
+def app():
+    """테스트마다 새 메모리 DB를 쓰는 앱"""
+    app = create_app(TestConfig)
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """블록 안에서 실행된 SQL 문 수를 세는 함수 - with count_queries() as counter: ... counter['count']"""
+    class QueryCounter:
+        def __enter__(self):
+            self.counter = {'count': 0}
+            with app.app_context():
+                self.engine = db.engine
+            event.listen(self.engine, 'before_cursor_execute', self._count)
+            return self.counter
+        
+        def __exit__(self, *exc_info):
+            event.remove(self.engine, 'before_cursor_execute', self._count)
+        
+        def _count(self, *args):
+            self.counter['count'] += 1
+    
+    return QueryCounter
+
+
+@pytest.fixture
+def make_workbook():
+    """엑셀 임포트용 파일(BytesIO) 생성 함수 - rows는 {컬럼: 값} 목록"""
+    def make(rows):
+        buffer = io.BytesIO()
+        pd.DataFrame(rows).to_excel(buffer, index=False)
+        buffer.seek(0)
+        return buffer
+    return make
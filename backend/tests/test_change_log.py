@@ -0,0 +1,30 @@
+from database_models import db, ChangeLog
+from utils import log_change
+
+
+def test_buffered_change_logs_follow_the_transaction(app):
+    with app.app_context():
+        log_change('user', 1, '사용자 정보변경', '이름', 'a', 'b', auto_commit=False)
+        db.session.rollback()
+        db.session.commit()
+        assert ChangeLog.query.count() == 0
+        
+        log_change('user', 1, '사용자 정보변경', '이름', 'a', 'b', auto_commit=False)
+        log_change('user', 1, '사용자 정보변경', '부서', 'c', 'd', auto_commit=False)
+        assert ChangeLog.query.count() == 0
+        db.session.commit()
+        assert sorted(log.field_name for log in ChangeLog.query) == ['부서', '이름']
+
+
+def test_request_change_logs_are_written_with_the_change(client):
+    response = client.post('/api/users', json={'name': '김민수', 'department': '개발팀', 'location': '15층'})
+    user_id = response.get_json()['id']
+    
+    client.put(f'/api/users/{user_id}', json={'department': '운영팀', 'location': '16층', 'changed_by': '관리자'})
+    
+    logs = [log for log in client.get(f'/api/change-logs/entity/user/{user_id}').get_json()
+            if log['change_type'] == '사용자 정보변경']
+    assert sorted((log['field_name'], log['old_value'], log['new_value']) for log in logs) == [
+        ('부서', '개발팀', '운영팀'), ('위치', '15층', '16층')
+    ]
+    assert all(log['changed_by'] == '관리자' for log in logs)
@@ -0,0 +1,78 @@
+from database_models import db, SecuritySeal, StatisticsCounter
+from dashboard_stats import RECONCILED_METRIC, reconcile_statistics
+from utils import bulk_insert
+
+
+def counters():
+    """집계 테이블 값 {(지표, 그룹): 값} (0인 행과 재집계 시각 제외)"""
+    return {
+        (row.metric, row.group_key): row.value
+        for row in StatisticsCounter.query
+        if row.value and row.metric != RECONCILED_METRIC
+    }
+
+
+def assert_consistent_with_reconcile(app):
+    with app.app_context():
+        before = counters()
+        reconcile_statistics()
+        db.session.commit()
+        assert before == counters()
+
+
+def create_equipment(client, asset_number, seal_numbers='', category='데스크탑'):
+    response = client.post('/api/equipment', json={
+        'asset_number': asset_number,
+        'category': category,
+        'model_name': '모델',
+        'acquisition_date': '2023-01-01',
+        'seal_numbers': seal_numbers
+    })
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def test_counters_match_reconcile_after_writes(app, client, make_workbook):
+    for i in range(4):
+        response = client.post('/api/users', json={'name': f'사용자{i}', 'department': f'부서{i % 2}', 'location': '15층'})
+        assert response.status_code == 201
+    ids = [create_equipment(client, str(i + 1), f'{i * 2 + 1},{i * 2 + 2}', '노트북' if i % 2 else '데스크탑')
+           for i in range(6)]
+    assignment = client.post('/api/assignments', json={'asset_number': '0001', 'user_id': 1}).get_json()
+    client.post('/api/assignments', json={'asset_number': '0002', 'user_id': 2})
+    assert_consistent_with_reconcile(app)
+    
+    # ORM 수정/삭제
+    client.put(f'/api/assignments/{assignment["id"]}/return', json={})
+    client.put(f'/api/users/3', json={'department': '새부서'})
+    client.put(f'/api/equipment/{ids[3]}', json={'category': '모니터', 'status': '폐기'})
+    client.delete(f'/api/equipment/{ids[4]}')
+    client.delete('/api/users/4')
+    seal_id = client.get(f'/api/security-seals/equipment/{ids[5]}').get_json()[0]['id']
+    client.put(f'/api/security-seals/{seal_id}', json={'status': '파손'})
+    assert_consistent_with_reconcile(app)
+    
+    # 대량 insert
+    with app.app_context():
+        bulk_insert(SecuritySeal, [
+            {'seal_number': f'9{n:03d}', 'equipment_id': ids[0], 'status': '정상' if n % 3 else '분실'}
+            for n in range(30)
+        ])
+        db.session.commit()
+    response = client.post('/api/security-seals/bulk', json={'start': '0500', 'end': '0509', 'equipment_id': ids[1]})
+    assert response.status_code == 201
+    assert_consistent_with_reconcile(app)
+    
+    # 덮어쓰기 임포트 (기존 장비 변경 + 새 장비/사용자/할당)
+    rows = [
+        {'구분': '모니터', '모델 명': '새모델', '번호': '1', '취득일자': '2024-01-15', '사용자': '사용자0', '부서': '부서0', '보안씰1': '7001'},
+        {'구분': '데스크탑', '모델 명': '모델', '번호': '50', '취득일자': '2024-01-15', '사용자': '임포트', '부서': '영업팀', '보안씰1': '7002'},
+    ]
+    response = client.post('/api/import/excel/execute', data={'file': (make_workbook(rows), 'import.xlsx'), 'overwrite': 'true'},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert_consistent_with_reconcile(app)
+    
+    stats = client.get('/api/statistics').get_json()
+    assert stats['total_equipment'] == 6
+    assert stats['by_category']['모니터'] == 2
@@ -0,0 +1,40 @@
+import pytest
+
+
+def seed_equipment(client, count):
+    """사용자 10명, 장비 count대(보안씰 1개씩, 짝수 번째는 사용 중)"""
+    for i in range(10):
+        response = client.post('/api/users', json={'name': f'사용자{i}', 'department': f'부서{i % 3}', 'location': '15층'})
+        assert response.status_code == 201
+    for i in range(count):
+        response = client.post('/api/equipment', json={
+            'asset_number': str(i + 1),
+            'category': '데스크탑',
+            'model_name': f'모델{i % 4}',
+            'acquisition_date': '2023-01-01',
+            'seal_numbers': str(i + 1)
+        })
+        assert response.status_code == 201
+        if i % 2 == 0:
+            response = client.post('/api/assignments', json={'asset_number': str(i + 1).zfill(4), 'user_id': i % 10 + 1})
+            assert response.status_code == 201
+
+
+@pytest.mark.parametrize('url', ['/api/equipment?page=1', '/api/equipment?cursor=&with_total=true'])
+def test_equipment_list_query_count_does_not_grow_with_page_size(client, count_queries, url):
+    seed_equipment(client, 50)
+    
+    with count_queries() as small_page:
+        response = client.get(f'{url}&per_page=1')
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 1
+    
+    with count_queries() as full_page:
+        response = client.get(f'{url}&per_page=50')
+    assert response.status_code == 200
+    items = response.get_json()['items']
+    assert len(items) == 50
+    assert all(item['security_seals'] for item in items)
+    assert sum('current_user' in item for item in items) == 25
+    
+    assert full_page['count'] == small_page['count']
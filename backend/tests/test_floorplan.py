@@ -0,0 +1,124 @@
+import pytest
+from floorplan_index import GridIndex, FloorSearchIndex, to_choseong
+
+FLOOR = 20
+ITEMS = [
+    {'id': 1, 'type': 'seat', 'code': 'A-1', 'name': '김민수', 'x': 0, 'y': 0, 'width': 70, 'height': 50},
+    {'id': 2, 'type': 'seat', 'code': 'A-2', 'name': '강민지', 'x': 60, 'y': 40, 'width': 70, 'height': 50},
+    {'id': 3, 'type': 'seat', 'code': 'B-1', 'name': '이영희', 'x': 300, 'y': 0, 'width': 70, 'height': 50},
+    {'id': 4, 'type': 'facility', 'name': '회의실', 'facilityType': 'facility-room', 'x': 500, 'y': 500, 'width': 100, 'height': 80},
+]
+
+
+@pytest.fixture
+def floor(client):
+    """기본 항목으로 저장된 테스트 층 (버전 1)"""
+    response = client.post(f'/api/floorplan/floor/{FLOOR}', json={'items': ITEMS, 'itemIdCounter': 5})
+    assert response.status_code == 200
+    assert response.get_json()['version'] == 1
+    return FLOOR
+
+
+def floor_data(client):
+    return client.get(f'/api/floorplan/floor/{FLOOR}').get_json()
+
+
+def patch(client, base_version, operations):
+    return client.patch(f'/api/floorplan/floor/{FLOOR}', json={'base_version': base_version, 'operations': operations})
+
+
+def test_patch_applies_operations_and_bumps_version(client, floor):
+    response = patch(client, 1, [
+        {'op': 'move', 'id': 2, 'x': 200, 'y': 200},
+        {'op': 'update', 'id': 1, 'changes': {'name': '홍길동'}},
+        {'op': 'add', 'item': {'type': 'seat', 'code': 'C-1', 'x': 0, 'y': 300, 'width': 70, 'height': 50}},
+        {'op': 'delete', 'id': 3},
+    ])
+    
+    assert response.status_code == 200
+    assert response.get_json()['version'] == 2
+    assert response.get_json()['itemIdCounter'] == 6
+    data = floor_data(client)
+    assert data['version'] == 2
+    items = {item['id']: item for item in data['data']['items']}
+    assert sorted(items) == [1, 2, 4, 5]
+    assert (items[2]['x'], items[2]['y']) == (200, 200)
+    assert items[1]['name'] == '홍길동'
+
+
+def test_patch_with_stale_version_is_rejected(client, floor):
+    assert patch(client, 1, [{'op': 'move', 'id': 1, 'x': 10, 'y': 10}]).status_code == 200
+    
+    response = patch(client, 1, [{'op': 'move', 'id': 1, 'x': 99, 'y': 99}])
+    
+    assert response.status_code == 409
+    assert response.get_json()['version'] == 2
+    item = next(item for item in floor_data(client)['data']['items'] if item['id'] == 1)
+    assert (item['x'], item['y']) == (10, 10)
+    
+    # 전체 저장도 기준 버전이 다르면 409
+    response = client.post(f'/api/floorplan/floor/{FLOOR}', json={'items': [], 'itemIdCounter': 1, 'base_version': 1})
+    assert response.status_code == 409
+    assert len(floor_data(client)['data']['items']) == 4
+
+
+def test_invalid_patch_applies_nothing(client, floor):
+    response = patch(client, 1, [{'op': 'move', 'id': 1, 'x': 10, 'y': 10}, {'op': 'delete', 'id': 99}])
+    
+    assert response.status_code == 400
+    data = floor_data(client)
+    assert data['version'] == 1
+    assert data['data']['items'][0]['x'] == 0
+    assert patch(client, 1, [{'op': 'rotate', 'id': 1}]).status_code == 400
+    assert client.patch(f'/api/floorplan/floor/{FLOOR}', json={'operations': []}).status_code == 400
+
+
+def test_grid_index_region_hit_and_collisions():
+    index = GridIndex(ITEMS, cell_size=100)
+    
+    assert [item['id'] for item in index.query_region(0, 0, 100, 100)] == [1, 2]
+    assert [item['id'] for item in index.query_region(550, 550, 2000, 2000)] == [4]
+    assert index.query_region(1000, 1000, 1100, 1100) == []
+    # 위에 그려진(나중) 항목부터
+    assert [item['id'] for item in index.hit_test(65, 45)] == [2, 1]
+    assert [(a['id'], b['id']) for a, b in index.collisions()] == [(1, 2)]
+    # 모서리만 맞닿으면 겹침이 아님
+    touching = [dict(ITEMS[0]), dict(ITEMS[0], id=9, x=70)]
+    assert GridIndex(touching).collisions() == []
+
+
+def test_floor_region_and_collision_endpoints_follow_edits(client, floor):
+    response = client.get(f'/api/floorplan/floor/{FLOOR}/region?x0=0&y0=0&x1=100&y1=100')
+    assert [item['id'] for item in response.get_json()['items']] == [1, 2]
+    assert client.get(f'/api/floorplan/floor/{FLOOR}/region?x0=0').status_code == 400
+    assert client.get(f'/api/floorplan/floor/{FLOOR}/collisions').get_json()['collisions'][0]['items'] == [1, 2]
+    
+    assert patch(client, 1, [{'op': 'move', 'id': 2, 'x': 200, 'y': 200}]).status_code == 200
+    
+    assert client.get(f'/api/floorplan/floor/{FLOOR}/collisions').get_json()['count'] == 0
+    assert [item['id'] for item in client.get(f'/api/floorplan/floor/{FLOOR}/hit?x=230&y=230').get_json()['items']] == [2]
+
+
+def test_choseong_search():
+    index = FloorSearchIndex(ITEMS)
+    
+    assert to_choseong('김민수') == 'ㄱㅁㅅ'
+    assert [item['name'] for item in index.search('ㄱㅁㅅ')] == ['김민수']
+    assert [item['name'] for item in index.search('ㄱㅁ')] == ['김민수', '강민지']
+    assert [item['name'] for item in index.search('ㅇㅎ')] == ['이영희']
+    assert [item['name'] for item in index.search('민')] == ['김민수', '강민지']
+    assert [item['code'] for item in index.search('a-')] == ['A-1', 'A-2']
+    assert index.search('ㄱㅎ') == []
+    assert index.stats['total_seats'] == 3
+    assert index.stats['total_facilities'] == 1
+
+
+def test_search_endpoint_matches_initial_consonants(client, floor):
+    response = client.get('/api/floorplan/search?q=ㄱㅁㅅ')
+    
+    results = [item for item in response.get_json()['results'] if item['floor'] == FLOOR]
+    assert [item['name'] for item in results] == ['김민수']
+    
+    assert patch(client, 1, [{'op': 'update', 'id': 3, 'changes': {'name': '김미선'}}]).status_code == 200
+    results = [item for item in client.get('/api/floorplan/search?q=ㄱㅁㅅ').get_json()['results'] if item['floor'] == FLOOR]
+    assert [item['name'] for item in results] == ['김민수', '김미선']
@@ -0,0 +1,146 @@
+import csv
+import time
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+import pandas as pd
+
+from routes.imports import EXPORT_COLUMNS
+
+ROWS = [
+    {'구분': '데스크탑', '모델 명': '모델A', '번호': '1', '취득일자': '2024-01-15',
+     '사용자': '김민수', '부서': '개발팀', '위치': '15층', '보안씰1': '1001', '보안씰2': '1002'},
+    {'구분': '노트북', '모델 명': '모델B', '번호': '2', '취득일자': '2024.03.20',
+     '사용자': '이영희', '부서': '개발팀', '위치': '15층', '보안씰1': '1003', '보안씰2': '-'},
+    {'구분': '모니터', '모델 명': '모델C', '번호': '3', '취득일자': '2024-01-15',
+     '사용자': '-', '부서': '-', '위치': '-', '보안씰1': '1004', '보안씰2': None},
+]
+
+
+def run_import(client, workbook, **form):
+    response = client.post('/api/import/excel/execute', data=dict(form, file=(workbook, 'import.xlsx')),
+                           content_type='multipart/form-data')
+    assert response.status_code in (200, 202), response.get_json()
+    return response.get_json()
+
+
+def equipment_by_asset_number(client):
+    items = client.get('/api/equipment?per_page=100').get_json()['items']
+    return {item['asset_number']: item for item in items}
+
+
+def import_logs(client):
+    return client.get('/api/change-logs?change_type=엑셀 임포트').get_json()
+
+
+def test_import_creates_rows_holders_and_change_logs(app, client, make_workbook):
+    app.config['IMPORT_CHUNK_SIZE'] = 2
+    
+    body = run_import(client, make_workbook(ROWS), changed_by='관리자')
+    
+    assert body['results'] == {
+        'equipment_created': 3, 'equipment_updated': 0, 'users_created': 2,
+        'assignments_created': 2, 'seals_created': 4, 'errors': []
+    }
+    equipment = equipment_by_asset_number(client)
+    assert sorted(equipment) == ['0001', '0002', '0003']
+    assert equipment['0001']['current_user']['name'] == '김민수'
+    assert equipment['0001']['status'] == '사용중'
+    assert equipment['0002']['current_user']['name'] == '이영희'
+    assert 'current_user' not in equipment['0003']
+    assert equipment['0003']['status'] == '사용가능'
+    assert sorted(seal['seal_number'] for seal in equipment['0001']['security_seals']) == ['1001', '1002']
+    assert len(client.get('/api/assignments/active').get_json()) == 2
+    
+    logs = import_logs(client)
+    assert sorted((log['entity_type'], log['field_name']) for log in logs) == \
+        [('equipment', '신규 장비')] * 3 + [('user', '신규 사용자')] * 2
+    assert {log['entity_id'] for log in logs if log['entity_type'] == 'equipment'} == \
+        {item['id'] for item in equipment.values()}
+    assert all(log['changed_by'] == '관리자' for log in logs)
+
+
+def test_import_without_overwrite_keeps_existing_rows(client, make_workbook):
+    run_import(client, make_workbook(ROWS))
+    
+    changed = [dict(ROWS[0], **{'모델 명': '바뀐모델', '사용자': '박철수'})]
+    body = run_import(client, make_workbook(changed))
+    
+    assert body['results']['equipment_created'] == 0
+    assert body['results']['equipment_updated'] == 0
+    assert body['results']['assignments_created'] == 0
+    equipment = equipment_by_asset_number(client)['0001']
+    assert equipment['model_name'] == '모델A'
+    assert equipment['current_user']['name'] == '김민수'
+
+
+def test_overwrite_import_updates_reassigns_and_moves_seals(client, make_workbook):
+    run_import(client, make_workbook(ROWS))
+    
+    changed = [dict(ROWS[0], **{'모델 명': '바뀐모델', '사용자': '박철수', '보안씰2': '1003'})]
+    body = run_import(client, make_workbook(changed), overwrite='true')
+    
+    assert body['results']['equipment_updated'] == 1
+    assert body['results']['assignments_created'] == 1
+    assert body['results']['users_created'] == 1
+    equipment = equipment_by_asset_number(client)
+    assert equipment['0001']['model_name'] == '바뀐모델'
+    assert equipment['0001']['current_user']['name'] == '박철수'
+    assert sorted(seal['seal_number'] for seal in equipment['0001']['security_seals']) == ['1001', '1002', '1003']
+    assert equipment['0002']['security_seals'] == []
+    
+    history = client.get(f'/api/assignments/equipment/{equipment["0001"]["id"]}').get_json()
+    assert sorted(assignment['status'] for assignment in history) == ['반납', '사용중']
+    assert len(client.get('/api/assignments/active').get_json()) == 2
+    assert [log['field_name'] for log in import_logs(client)].count('장비 업데이트') == 1
+
+
+def test_background_import_job(app, client, make_workbook):
+    app.config['IMPORT_CHUNK_SIZE'] = 1
+    
+    job = run_import(client, make_workbook(ROWS), **{'async': 'true'})['job']
+    deadline = time.monotonic() + 10
+    while job['status'] not in ('completed', 'failed') and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(f'/api/import/jobs/{job["job_id"]}').get_json()
+    
+    assert job['status'] == 'completed', job['error']
+    assert job['rows_processed'] == job['total_rows'] == 3
+    assert job['results']['equipment_created'] == 3
+    assert sorted(equipment_by_asset_number(client)) == ['0001', '0002', '0003']
+    assert client.get('/api/import/jobs/unknown').status_code == 404
+
+
+def test_upload_limit_is_per_endpoint(app, client, make_workbook):
+    app.config['UPLOAD_LIMITS'] = {'imports.execute_excel_import': 1024}
+    
+    response = client.post('/api/import/excel/execute', data={'file': (make_workbook(ROWS), 'import.xlsx')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 413
+    
+    # 제한이 지정되지 않은 엔드포인트는 MAX_CONTENT_LENGTH 적용
+    response = client.post('/api/import/excel/preview', data={'file': (make_workbook(ROWS), 'import.xlsx')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert equipment_by_asset_number(client) == {}
+
+
+
+def test_export_excel_and_streaming_csv_match(app, client, make_workbook):
+    run_import(client, make_workbook(ROWS))
+    
+    response = client.get('/api/export/excel')
+    assert response.status_code == 200
+    sheet = pd.read_excel(BytesIO(response.data), dtype=str)
+    assert list(sheet.columns) == EXPORT_COLUMNS
+    
+    with patch('routes.imports.EXPORT_PAGE_SIZE', 1):
+        response = client.get('/api/export/excel?format=csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.reader(StringIO(response.get_data(as_text=True).lstrip('\ufeff'))))
+    assert rows[0] == EXPORT_COLUMNS
+    assert rows[1:] == sheet.fillna('').values.tolist()
+    assert sorted(row[2] for row in rows[1:]) == ['0001', '0002']
+    
+    assert client.get('/api/export/excel?format=pdf').status_code == 400
@@ -0,0 +1,75 @@
+def create_equipment(client, asset_number, seal_numbers=''):
+    response = client.post('/api/equipment', json={
+        'asset_number': asset_number,
+        'category': '데스크탑',
+        'model_name': '모델',
+        'acquisition_date': '2023-01-01',
+        'seal_numbers': seal_numbers
+    })
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def seal_count(client):
+    return len(client.get('/api/security-seals').get_json())
+
+
+def test_bulk_range_creates_seals_in_order(client):
+    equipment_id = create_equipment(client, '1')
+    
+    response = client.post('/api/security-seals/bulk', json={'start': '0001', 'end': '0020', 'equipment_id': equipment_id})
+    
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['created'] == 20
+    assert [item['seal_number'] for item in body['items']] == [str(n).zfill(4) for n in range(1, 21)]
+    assert seal_count(client) == 20
+
+
+def test_bulk_range_overlapping_existing_seals_is_rejected(client):
+    create_equipment(client, '1', '0005,0007')
+    equipment_id = create_equipment(client, '2')
+    
+    response = client.post('/api/security-seals/bulk', json={'start': '0001', 'end': '0010', 'equipment_id': equipment_id})
+    
+    assert response.status_code == 400
+    duplicates = response.get_json()['duplicates']
+    assert [d['seal_number'] for d in duplicates] == ['0005', '0007']
+    assert all(d['equipment_asset_number'] == '0001' for d in duplicates)
+    # 하나라도 겹치면 아무것도 등록하지 않음
+    assert seal_count(client) == 2
+
+
+def test_bulk_range_at_limit_is_accepted(app, client):
+    app.config['SEAL_BULK_LIMIT'] = 50
+    equipment_id = create_equipment(client, '1')
+    
+    response = client.post('/api/security-seals/bulk', json={'start': '0001', 'end': '0050', 'equipment_id': equipment_id})
+    
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 50
+
+
+def test_bulk_range_over_limit_is_rejected(app, client):
+    app.config['SEAL_BULK_LIMIT'] = 50
+    equipment_id = create_equipment(client, '1')
+    
+    response = client.post('/api/security-seals/bulk', json={'start': '0001', 'end': '0051', 'equipment_id': equipment_id})
+    assert response.status_code == 400
+    assert '최대 50개' in response.get_json()['error']
+    
+    response = client.post('/api/security-seals/bulk', json={
+        'seal_numbers': [str(n) for n in range(1, 52)], 'equipment_id': equipment_id
+    })
+    assert response.status_code == 400
+    assert seal_count(client) == 0
+
+
+def test_bulk_range_over_default_limit_is_rejected(app, client):
+    equipment_id = create_equipment(client, '1')
+    limit = app.config['SEAL_BULK_LIMIT']
+    
+    response = client.post('/api/security-seals/bulk', json={'start': '1', 'end': str(limit + 1), 'equipment_id': equipment_id})
+    
+    assert response.status_code == 400
+    assert seal_count(client) == 0
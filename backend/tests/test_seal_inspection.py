@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+from database_models import db, SecuritySeal
+from utils import bulk_insert
+
+
+def create_equipment(client, asset_number, seal_numbers=''):
+    response = client.post('/api/equipment', json={
+        'asset_number': asset_number,
+        'category': '데스크탑',
+        'model_name': '모델',
+        'acquisition_date': '2023-01-01',
+        'seal_numbers': seal_numbers
+    })
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def create_seal(client, equipment_id, seal_number, **fields):
+    response = client.post('/api/security-seals', json=dict(fields, seal_number=seal_number, equipment_id=equipment_id))
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def interval(app):
+    return timedelta(days=app.config['SEAL_INSPECTION_INTERVAL_DAYS'])
+
+
+def due_seal_numbers(client, before='2100-01-01'):
+    response = client.get(f'/api/security-seals/due?before={before}')
+    assert response.status_code == 200
+    return [item['seal_number'] for item in response.get_json()['items']]
+
+
+def test_orm_insert_sets_due_from_attached_date(app, client):
+    equipment_id = create_equipment(client, '1')
+    
+    seal = create_seal(client, equipment_id, '0001', attached_date='2024-01-10')
+    
+    assert seal['next_inspection_due'] == (date(2024, 1, 10) + interval(app)).isoformat()
+
+
+def test_orm_insert_without_attached_date_uses_today_utc(app, client):
+    equipment_id = create_equipment(client, '1', '0001')
+    
+    seal = client.get(f'/api/security-seals/equipment/{equipment_id}').get_json()[0]
+    
+    today = datetime.utcnow().date()
+    assert seal['attached_date'] == today.isoformat()
+    assert seal['next_inspection_due'] == (today + interval(app)).isoformat()
+
+
+def test_bulk_insert_sets_due_and_default_attached_date(app, client):
+    equipment_id = create_equipment(client, '1')
+    
+    with app.app_context():
+        bulk_insert(SecuritySeal, [
+            {'seal_number': '0001', 'equipment_id': equipment_id, 'status': '정상'},
+            {'seal_number': '0002', 'equipment_id': equipment_id, 'status': '분실'},
+        ])
+        db.session.commit()
+        seals = {seal.seal_number: seal for seal in SecuritySeal.query}
+        
+        today = datetime.utcnow().date()
+        assert seals['0001'].attached_date == today
+        assert seals['0001'].next_inspection_due == today + interval(app)
+        assert seals['0002'].next_inspection_due is None
+    
+    response = client.post('/api/security-seals/bulk', json={
+        'start': '0100', 'end': '0101', 'equipment_id': equipment_id, 'attached_date': '2024-03-01'
+    })
+    assert response.status_code == 201
+    due = (date(2024, 3, 1) + interval(app)).isoformat()
+    assert [seal['next_inspection_due'] for seal in client.get('/api/security-seals/search?seal_number=010').get_json()] == [due, due]
+
+
+def test_update_recomputes_due(app, client):
+    equipment_id = create_equipment(client, '1')
+    seal = create_seal(client, equipment_id, '0001', attached_date='2024-01-10')
+    
+    response = client.put(f'/api/security-seals/{seal["id"]}', json={'attached_date': '2024-02-01'})
+    assert response.get_json()['next_inspection_due'] == (date(2024, 2, 1) + interval(app)).isoformat()
+    
+    # 점검일이 있으면 점검일 기준
+    response = client.put(f'/api/security-seals/{seal["id"]}', json={'inspection_date': '2024-05-01'})
+    assert response.get_json()['next_inspection_due'] == (date(2024, 5, 1) + interval(app)).isoformat()
+    
+    # 분실/폐기는 점검 대상이 아님
+    response = client.put(f'/api/security-seals/{seal["id"]}', json={'status': '분실'})
+    assert response.get_json()['next_inspection_due'] is None
+
+
+def test_due_filter_returns_seals_due_before_date_in_order(client):
+    equipment_id = create_equipment(client, '1')
+    create_seal(client, equipment_id, '0001', attached_date='2024-03-01')
+    create_seal(client, equipment_id, '0002', attached_date='2024-01-01')
+    create_seal(client, equipment_id, '0003', attached_date='2025-01-01')
+    create_seal(client, equipment_id, '0004', attached_date='2023-01-01', status='폐기')
+    
+    # 예정일: 0002 2024-06-29, 0001 2024-08-28, 0003 2025-06-30
+    assert due_seal_numbers(client, '2024-08-28') == ['0002']
+    assert due_seal_numbers(client, '2024-08-29') == ['0002', '0001']
+    assert due_seal_numbers(client) == ['0002', '0001', '0003']
+    
+    response = client.get('/api/security-seals/due?before=2024-13-01')
+    assert response.status_code == 400
+
+
+def test_excel_import_seals_get_due_date(app, client, make_workbook):
+    workbook = make_workbook([
+        {'구분': '데스크탑', '모델 명': '모델', '번호': '1', '취득일자': '2024-01-15', '보안씰1': '1001'},
+    ])
+    
+    response = client.post('/api/import/excel/execute', data={'file': (workbook, 'import.xlsx')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    
+    due = (datetime.utcnow().date() + interval(app)).isoformat()
+    seals = client.get('/api/security-seals').get_json()
+    assert [(seal['seal_number'], seal['next_inspection_due']) for seal in seals] == [('1001', due)]
+    assert due_seal_numbers(client) == ['1001']
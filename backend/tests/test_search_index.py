@@ -0,0 +1,96 @@
+import search_index
+from database_models import db, User, SearchNgram
+from search_index import BUILT_MARKER, filter_contains, ensure_index, is_built, field_key
+
+NAMES = ['김철수', '박철수', '이영희', '김수', '철', 'Kim Lee', 'lee-kim']
+# gram(2자)보다 짧은 검색어, 중간/끝 일치, 대소문자, 없는 값 포함
+TERMS = ['철', '철수', '김', '김철', '수', '영희', 'lee', 'KIM', 'e-k', '없는이름', '철수김']
+
+
+def create_user(client, name):
+    response = client.post('/api/users', json={'name': name, 'department': '개발팀', 'location': '15층'})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def assert_matches_like(column, terms=TERMS):
+    for term in terms:
+        indexed = {row.id for row in filter_contains(User.query, column, term)}
+        expected = {row.id for row in User.query.filter(column.like(f'%{term}%'))}
+        assert indexed == expected, term
+
+
+def test_search_matches_like_after_insert_update_delete(app, client):
+    ids = [create_user(client, name) for name in NAMES]
+    with app.app_context():
+        assert is_built(field_key(User.name))
+        assert_matches_like(User.name)
+    
+    client.put(f'/api/users/{ids[0]}', json={'name': '최영철'})
+    client.put(f'/api/users/{ids[5]}', json={'name': 'Park'})
+    with app.app_context():
+        assert_matches_like(User.name)
+    
+    client.delete(f'/api/users/{ids[1]}')
+    client.delete(f'/api/users/{ids[2]}')
+    with app.app_context():
+        assert_matches_like(User.name)
+    
+    names = {user['name'] for user in client.get('/api/users/search?name=철').get_json()}
+    assert names == {'최영철', '철'}
+
+
+def test_search_falls_back_to_like_until_index_built(app, client):
+    with app.app_context():
+        # SQL로 직접 넣은 행은 색인되지 않음
+        db.session.execute(db.text(
+            "INSERT INTO user (name, department, location, created_at, updated_at) "
+            "VALUES ('김철수', '개발팀', '15층', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        db.session.execute(db.delete(SearchNgram).where(SearchNgram.gram == BUILT_MARKER))
+        db.session.commit()
+        search_index._built_fields.clear()
+        
+        assert not is_built(field_key(User.name))
+        assert_matches_like(User.name)
+    assert [user['name'] for user in client.get('/api/users/search?name=철수').get_json()] == ['김철수']
+    
+    with app.app_context():
+        counts = ensure_index()
+        db.session.commit()
+        assert counts[field_key(User.name)] == 1
+        assert is_built(field_key(User.name))
+        assert db.session.scalar(
+            db.select(db.func.count()).where(SearchNgram.field == 'user.name', SearchNgram.value == '김철수')
+        ) == 2
+    assert [user['name'] for user in client.get('/api/users/search?name=철수').get_json()] == ['김철수']
+
+
+def test_built_state_is_cached(app, client, count_queries):
+    create_user(client, '김철수')
+    with app.app_context():
+        filter_contains(User.query, User.name, '철수').all()
+        with count_queries() as counter:
+            assert is_built(field_key(User.name))
+        assert counter['count'] == 0
+
+
+def test_asset_number_search_after_bulk_and_update(client):
+    for asset_number in ['42', '142', '420']:
+        response = client.post('/api/equipment', json={
+            'asset_number': asset_number, 'category': '데스크탑', 'model_name': '모델', 'acquisition_date': '2023-01-01'
+        })
+        assert response.status_code == 201
+    
+    def search(term):
+        items = client.get(f'/api/equipment?asset_number={term}').get_json()['items']
+        return sorted(item['asset_number'] for item in items)
+    
+    assert search('042') == ['0042', '0420']
+    assert search('4') == ['0042', '0142', '0420']
+    
+    equipment_id = client.get('/api/equipment?asset_number=0420').get_json()['items'][0]['id']
+    response = client.put(f'/api/equipment/{equipment_id}', json={'asset_number': '777'})
+    assert response.status_code == 200
+    assert search('042') == ['0042']
+    assert search('077') == ['0777']
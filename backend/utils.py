@@ -1,7 +1,24 @@
 import re
+import json
+import time
+import base64
+import hashlib
+import threading
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime
-from database_models import db, ChangeLog
+from flask import current_app, request, jsonify
+from flask.wrappers import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Query, Session
+from database_models import db, ChangeLog, SecuritySeal
+from search_index import index_rows
+from dashboard_stats import COUNTED_FIELDS, count_rows
+from seal_inspection import fill_next_inspection_due
+
+# 근사 건수 캐시 {검색 조건: (건수, 저장 시각)} - 오래 쓰지 않은 순서로 정렬 (LRU)
+_count_cache = OrderedDict()
+_count_cache_lock = threading.Lock()
 
 
 def format_padded_number(value, length=4):
@@ -33,6 +50,31 @@ def format_seal_number(seal_number):
     return format_padded_number(seal_number, 4)
 
 
+def expand_seal_range(start, end, limit=None):
+    """보안씰 번호 범위(시작~끝, 양끝 포함)를 포맷된 번호 목록으로 펼침
+    
+    'A-0001'처럼 접두어가 있으면 양끝의 접두어가 같아야 한다.
+    잘못된 범위이거나 개수가 limit을 넘으면 ValueError.
+    """
+    pattern = r'^([A-Za-z가-힣]+-?)?(\d+)$'
+    start_match = re.match(pattern, str(start or '').strip())
+    end_match = re.match(pattern, str(end or '').strip())
+    if not start_match or not end_match:
+        raise ValueError('보안씰 범위는 숫자(접두어 허용)로 지정해야 합니다.')
+    
+    prefix = start_match.group(1) or ''
+    if prefix != (end_match.group(1) or ''):
+        raise ValueError('범위 시작과 끝의 접두어가 다릅니다.')
+    first, last = int(start_match.group(2)), int(end_match.group(2))
+    if first > last:
+        raise ValueError('범위 시작이 끝보다 큽니다.')
+    if limit and last - first + 1 > limit:
+        raise ValueError(f'한 번에 등록할 수 있는 보안씰은 최대 {limit}개입니다.')
+    
+    width = len(start_match.group(2))
+    return [format_seal_number(f'{prefix}{str(number).zfill(width)}') for number in range(first, last + 1)]
+
+
 def clean_value(value):
     """엑셀 값 정리 - 빈값, '-', NaN 처리"""
     if value is None:
@@ -60,8 +102,7 @@ def parse_date(value):
     if isinstance(value, datetime):
         return value.date()
     
-    date_formats = ['%Y-%m-%d', '%Y.%m.%d', '%Y/%m/%d', '%d-%m-%Y', '%d.%m.%Y']
-    for fmt in date_formats:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(cleaned, fmt).date()
         except ValueError:
@@ -70,24 +111,88 @@ def parse_date(value):
     return None
 
 
+# 커밋 대기 중인 변경 이력 행 (session.info 키)
+CHANGE_LOG_BUFFER_KEY = 'pending_change_logs'
+
+EMPTY_CELL_VALUES = ['-', '', 'nan', 'None', 'NaN']
+DATE_FORMATS = ['%Y-%m-%d', '%Y.%m.%d', '%Y/%m/%d', '%d-%m-%Y', '%d.%m.%Y']
+
+
+def clean_series(series):
+    """엑셀 컬럼 전체 정리 - clean_value의 Series 버전 (빈값, '-', NaN -> None)"""
+    text = series.astype(str).str.strip().astype(object)
+    empty = series.isna() | text.isin(EMPTY_CELL_VALUES)
+    return text.where(~empty, None)
+
+
+def format_padded_series(series, length=4):
+    """format_padded_number의 Series 버전 - 숫자 또는 접두어+숫자 형식만 0 패딩
+    
+    clean_series로 정리된(앞뒤 공백 제거, 빈값 None) 컬럼을 받는다.
+    """
+    series = series.astype(object)
+    parts = series.str.extract(r'^([A-Za-z가-힣]+-?)?(\d+)$')
+    matched = parts[1].notna()
+    padded = parts[0].fillna('') + parts[1].str.zfill(length)
+    return series.where(~matched, padded).astype(object)
+
+
+def parse_date_series(series):
+    """parse_date의 Series 버전 - 날짜 셀은 그대로 변환하고, 문자열은 형식별로 한 번씩 일괄 변환"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.date.astype(object).where(series.notna(), None)
+    
+    parsed = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    is_datetime = series.map(lambda v: isinstance(v, datetime))
+    if is_datetime.any():
+        parsed[is_datetime] = pd.to_datetime(series[is_datetime])
+    
+    text = clean_series(series)
+    for fmt in DATE_FORMATS:
+        remaining = parsed.isna() & text.notna() & ~is_datetime
+        if not remaining.any():
+            break
+        parsed[remaining] = pd.to_datetime(text[remaining], format=fmt, errors='coerce')
+    
+    return parsed.dt.date.astype(object).where(parsed.notna(), None)
+
+
 def log_change(entity_type, entity_id, change_type, field_name, old_value, new_value, 
                changed_by=None, reason=None, auto_commit=True):
-    """변경 이력 기록"""
-    log = ChangeLog(
-        entity_type=entity_type,
-        entity_id=entity_id,
-        change_type=change_type,
-        field_name=field_name,
-        old_value=old_value,
-        new_value=new_value,
-        changed_by=changed_by,
-        reason=reason
-    )
-    db.session.add(log)
+    """변경 이력 기록
+    
+    이력 행은 세션 버퍼에 모았다가 커밋 직전에 multi-row INSERT 한 번으로 같은 트랜잭션에 저장한다.
+    auto_commit=False이면 호출자의 커밋에 함께 저장되고, 롤백되면 함께 버려진다.
+    """
+    # 트랜잭션이 시작되지 않은 세션의 rollback()은 롤백 이벤트 없이 지나가므로 먼저 시작해 둔다
+    db.session.connection()
+    db.session.info.setdefault(CHANGE_LOG_BUFFER_KEY, []).append({
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'change_date': datetime.utcnow(),
+        'change_type': change_type,
+        'field_name': field_name,
+        'old_value': old_value,
+        'new_value': new_value,
+        'changed_by': changed_by,
+        'reason': reason
+    })
     if auto_commit:
         db.session.commit()
 
 
+@event.listens_for(Session, 'before_commit')
+def _write_buffered_change_logs(session):
+    rows = session.info.pop(CHANGE_LOG_BUFFER_KEY, None)
+    if rows:
+        bulk_insert(ChangeLog, rows)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_buffered_change_logs(session, previous_transaction):
+    session.info.pop(CHANGE_LOG_BUFFER_KEY, None)
+
+
 def check_seal_duplicate(seal_number, exclude_seal_id=None, exclude_equipment_id=None):
     """보안씰 중복 체크"""
     from database_models import SecuritySeal
@@ -100,4 +205,193 @@ def check_seal_duplicate(seal_number, exclude_seal_id=None, exclude_equipment_id
     if exclude_equipment_id:
         query = query.filter(SecuritySeal.equipment_id != exclude_equipment_id)
     
-    return query.first()
\ No newline at end of file
+    return query.first()
+
+
+def check_seal_duplicates(seal_numbers, exclude_seal_id=None, exclude_equipment_id=None, chunk_size=1000):
+    """보안씰 중복 일괄 체크 - 이미 등록된 번호만 {씰번호: {seal_id, equipment_id, equipment_asset_number}}
+    
+    seal_numbers는 포맷된 번호 목록이며, 결과는 입력 순서를 따른다.
+    소유 장비의 자산번호까지 한 번의 조인 조회로 가져온다 (chunk_size개씩 IN 조회).
+    """
+    from database_models import SecuritySeal, Equipment
+    
+    seal_numbers = list(dict.fromkeys(seal_numbers))
+    found = {}
+    for i in range(0, len(seal_numbers), chunk_size):
+        query = db.select(
+            SecuritySeal.seal_number, SecuritySeal.id, SecuritySeal.equipment_id, Equipment.asset_number
+        ).outerjoin(Equipment, SecuritySeal.equipment_id == Equipment.id).where(
+            SecuritySeal.seal_number.in_(seal_numbers[i:i + chunk_size])
+        ).order_by(SecuritySeal.id)
+        if exclude_seal_id:
+            query = query.where(SecuritySeal.id != exclude_seal_id)
+        if exclude_equipment_id:
+            query = query.where(SecuritySeal.equipment_id != exclude_equipment_id)
+        
+        for seal_number, seal_id, equipment_id, asset_number in db.session.execute(query):
+            found.setdefault(seal_number, {
+                'seal_id': seal_id,
+                'equipment_id': equipment_id,
+                'equipment_asset_number': asset_number
+            })
+    return {seal_number: found[seal_number] for seal_number in seal_numbers if seal_number in found}
+
+
+def encode_cursor(*values):
+    """키셋 페이지네이션 커서 생성 (마지막 행의 정렬 키 값)"""
+    raw = json.dumps(list(values), ensure_ascii=False, default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, *parsers):
+    """키셋 페이지네이션 커서 해석 - 빈 커서는 첫 페이지(None)
+    
+    parsers가 주어지면 값 개수가 같아야 하며 각 값을 해당 함수로 변환한다
+    (예: decode_cursor(cursor, date.fromisoformat, int)). 형식이 다르면 ValueError.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        if not isinstance(values, list) or (parsers and len(values) != len(parsers)):
+            raise ValueError
+        if parsers:
+            values = [parse(value) for parse, value in zip(parsers, values)]
+    except (TypeError, ValueError, IndexError, UnicodeError):
+        raise ValueError('잘못된 커서입니다.')
+    return values
+
+
+def keyset_page(query, cursor, per_page, keys, descending=False):
+    """keys((컬럼, 커서 값 변환 함수) 목록) 순 키셋 페이지 (행 목록, next_cursor) - 잘못된 커서는 ValueError"""
+    columns = [column for column, _ in keys]
+    last = decode_cursor(cursor, *[parse for _, parse in keys])
+    if last:
+        # (c1, c2) > (v1, v2) 를 색인 범위 조회가 가능한 c1 > v1 OR (c1 = v1 AND c2 > v2) 형태로
+        condition = None
+        for column, value in reversed(list(zip(columns, last))):
+            after = column < value if descending else column > value
+            condition = after if condition is None else db.or_(after, db.and_(column == value, condition))
+        query = query.filter(condition)
+    
+    query = query.order_by(*[column.desc() if descending else column for column in columns]).limit(per_page + 1)
+    rows = query.all() if isinstance(query, Query) else db.session.execute(query).all()
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(*[getattr(rows[-1], column.key) for column in columns])
+    return rows, next_cursor
+
+
+def table_version(model):
+    """테이블 데이터 버전 (행 수, 최대 id, 최대 updated_at) - 조건부 응답 ETag용
+    
+    updated_at이 없는 테이블은 created_at을 쓴다. 행 수는 삭제를, 최대 id는 추가를 잡아낸다.
+    """
+    timestamp = getattr(model, 'updated_at', None) or model.created_at
+    row = db.session.execute(
+        db.select(db.func.count(model.id), db.func.max(model.id), db.func.max(timestamp))
+    ).one()
+    return tuple(row)
+
+
+def change_log_version(*entity_types):
+    """해당 엔티티 종류의 마지막 변경 이력 id
+    
+    updated_at이 없거나 같은 초 안에 여러 번 바뀌는 경우도 변경 이력으로 구분한다.
+    """
+    return db.session.execute(
+        db.select(db.func.max(ChangeLog.id)).where(ChangeLog.entity_type.in_(entity_types))
+    ).scalar()
+
+
+def data_etag(*versions):
+    """데이터 버전 값들로 만든 강한 ETag"""
+    raw = json.dumps(versions, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def conditional_json(etag, build, last_modified=None):
+    """조건부 GET 응답
+    
+    If-None-Match(없으면 If-Modified-Since)가 현재 버전과 맞으면 본문을 만들지 않고 304를,
+    아니면 build() 결과를 JSON으로 반환한다. Cache-Control: no-cache로 매번 재검증하게 한다.
+    """
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = bool(
+            last_modified and request.if_modified_since
+            and last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+        )
+    
+    if not_modified:
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def cached_count(key, query, refresh=False):
+    """COUNT 결과를 COUNT_CACHE_TTL 초 동안 캐시 (근사 전체 건수용, 최대 COUNT_CACHE_SIZE개)"""
+    ttl = current_app.config.get('COUNT_CACHE_TTL', 60)
+    max_size = current_app.config.get('COUNT_CACHE_SIZE', 256)
+    now = time.monotonic()
+    
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+        if cached and not refresh and now - cached[1] < ttl:
+            _count_cache.move_to_end(key)
+            return cached[0]
+    
+    total = query.count()
+    with _count_cache_lock:
+        _count_cache[key] = (total, now)
+        _count_cache.move_to_end(key)
+        # 가장 오래 쓰지 않은 쪽부터 만료되었거나 한도를 넘는 항목 제거
+        while _count_cache:
+            oldest_key, (_, stored_at) = next(iter(_count_cache.items()))
+            if len(_count_cache) <= max_size and now - stored_at < ttl:
+                break
+            del _count_cache[oldest_key]
+    return total
+
+
+def bulk_insert(model, rows, chunk_size=1000):
+    """multi-row INSERT로 일괄 저장
+    
+    ORM flush를 거치지 않으므로 검색 색인과 대시보드 집계, 보안씰 다음 점검 예정일을 여기서 함께 갱신한다.
+    rows는 모두 같은 키를 가진 dict 목록이어야 한다.
+    """
+    if not rows:
+        return
+    if model is SecuritySeal:
+        fill_next_inspection_due(rows)
+    table = model.__table__
+    for i in range(0, len(rows), chunk_size):
+        db.session.execute(table.insert(), rows[i:i + chunk_size])
+    index_rows(model, rows)
+    if model in COUNTED_FIELDS:
+        count_rows(model, rows)
+
+
+class UploadLimitRequest(Request):
+    """엔드포인트별 업로드 크기 제한 요청 클래스
+    
+    UPLOAD_LIMITS 설정({엔드포인트명: 바이트})에 있는 엔드포인트는 그 값을,
+    없으면 MAX_CONTENT_LENGTH를 적용한다.
+    """
+    
+    @property
+    def max_content_length(self):
+        if current_app and self.endpoint:
+            limits = current_app.config.get('UPLOAD_LIMITS') or {}
+            if self.endpoint in limits:
+                return limits[self.endpoint]
+        return super().max_content_length
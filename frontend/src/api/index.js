@@ -47,11 +47,14 @@ export const sealApi = {
   getAll: () => api.get('/security-seals'),
   getById: (id) => api.get(`/security-seals/${id}`),
   create: (data) => api.post('/security-seals', data),
+  bulkCreate: (data) => api.post('/security-seals/bulk', data),
   update: (id, data) => api.put(`/security-seals/${id}`, data),
   delete: (id, data) => api.delete(`/security-seals/${id}`, { data }),
   search: (params) => api.get('/security-seals/search', { params }),
+  getDue: (params) => api.get('/security-seals/due', { params }),
   getByEquipment: (equipmentId) => api.get(`/security-seals/equipment/${equipmentId}`),
-  checkDuplicate: (params) => api.get('/security-seals/check-duplicate', { params })
+  checkDuplicate: (params) => api.get('/security-seals/check-duplicate', { params }),
+  checkDuplicates: (data) => api.post('/security-seals/check-duplicates', data)
 }
 
 // ==================== 수리/점검 API ====================
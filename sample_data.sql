@@ -171,6 +171,11 @@ INSERT INTO security_seal (seal_number, equipment_id, attached_date, attached_lo
 ('3013', 48, '2024-06-19', '뒷면', '정상', NULL, '예비', NOW()),
 ('3014', 49, '2024-08-21', '뒷면', '정상', NULL, NULL, NOW());
 
+-- 보안씰 다음 점검 예정일 계산 (flask recompute-seal-inspections 와 동일, 기본 점검 주기 180일)
+UPDATE security_seal
+SET next_inspection_due = DATE_ADD(COALESCE(inspection_date, attached_date), INTERVAL 180 DAY)
+WHERE status NOT IN ('분실', '폐기');
+
 -- ============================================
 -- 4. 할당 데이터 (현재 사용중인 장비)
 -- ============================================
@@ -243,6 +248,11 @@ INSERT INTO assignment (equipment_id, user_id, assignment_date, return_date, sta
 (30, 18, '2021-06-20', '2024-01-15', '반납', 'MacBook으로 교체', '관리자', '2021-06-20 09:00:00'), -- 장예린 이전 노트북
 (50, 3, '2018-05-15', '2022-06-20', '반납', '화면 불량 폐기', '관리자', '2018-05-15 09:00:00');  -- 박철수 이전 모니터
 
+-- 장비의 현재 사용자 컬럼 동기화 (flask repair-current-holders 와 동일)
+UPDATE equipment e
+JOIN assignment a ON a.equipment_id = e.id AND a.status = '사용중'
+SET e.current_assignment_id = a.id, e.current_user_id = a.user_id;
+
 -- ============================================
 -- 6. 수리/점검 이력
 -- ============================================
@@ -294,6 +304,10 @@ INSERT INTO change_log (entity_type, entity_id, change_date, change_type, field_
 ('user', 1, '2023-06-01 10:00:00', '사용자 정보변경', '전화번호', '010-0000-0000', '010-1234-5678', '인사팀', '연락처 변경'),
 ('user', 6, '2024-01-10 09:00:00', '사용자 정보변경', '위치', '15층', '14층', '인사팀', '부서 이동');
 
+-- 부분 문자열 검색 색인 완료 표시 제거 - 다음 앱 시작 시 위 데이터까지 색인된다
+-- (실행 중인 앱에 반영: 앱 재시작 또는 flask rebuild-search-index)
+DELETE FROM search_ngram WHERE gram = '';
+
 -- ============================================
 -- 완료 메시지
 -- ============================================